@@ -2,33 +2,52 @@ import asyncio
 import logging
 import ssl
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
 
 import aiohttp
-from pydantic import BaseModel, HttpUrl
-from tenacity import (RetryCallState, retry, retry_if_exception_type,
-                      stop_after_attempt, wait_exponential)
+from yarl import URL
 
 logger = logging.getLogger(__name__)
 
+# Максимальное количество результатов проверки, хранимых в кэше
+RESULT_CACHE_SIZE = 10_000
+# После стольких неудачных проверок подряд хост считается недоступным...
+HOST_FAILURE_THRESHOLD = 3
+# ...в течение этого окна (в секундах)
+HOST_FAILURE_WINDOW = 60.0
+# Статусы, с которыми серверы отвечают на неподдерживаемый HEAD-запрос
+HEAD_FALLBACK_STATUSES = frozenset({400, 403, 405, 501})
 
-class URLResponse(BaseModel):
+
+@dataclass(slots=True)
+class URLResponse:
     """Модель ответа от URL"""
 
-    url: HttpUrl
+    url: str
     status: int
     is_available: bool
-    final_url: Optional[HttpUrl] = None # Конечный URL после всех редиректов
+    final_url: Optional[str] = None # Конечный URL после всех редиректов
     error: Optional[str] = None
-    headers: Optional[Dict[str, str]] = None
+    headers: Optional[Dict[str, str]] = None  # Заполняется только при include_headers=True
     content_type: Optional[str] = None
     response_time: Optional[float] = None
     retry_count: Optional[int] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает ответ в виде словаря (например, для сериализации в JSON)"""
+        return asdict(self)
+
 
 class URLChecker:
     """Класс для асинхронной проверки URL"""
 
+    # Ошибки, после которых запрос повторяется. TooManyRedirects тоже является
+    # ClientError, но перехватывается раньше и не повторяется
+    _RETRYABLE_EXC = (asyncio.TimeoutError, aiohttp.ClientError)
+
     def __init__(
         self,
         timeout: int = 5,
@@ -38,9 +57,18 @@ class URLChecker:
         retry_max_delay: float = 10.0,
         headers: Optional[Dict[str, str]] = None,
         max_redirects_count: int = 20,  # Максимальное количество редиректов (увеличено для теста)
+        max_concurrency: int = 10,  # Максимальное количество одновременных запросов
+        method: str = "HEAD",  # HEAD с переходом на GET, если сервер его не поддерживает
+        include_headers: bool = False,  # Сохранять все заголовки ответа в URLResponse
     ):
         self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.method = method.upper()
+        self.include_headers = include_headers
         self.max_retries = max_retries
+        # Аргументы запроса, общие для всех URL. allow_redirects передается явно:
+        # у ClientSession.head по умолчанию allow_redirects=False
+        self._request_kwargs: Dict[str, Any] = {}
         self.max_redirects_count = max_redirects_count
         self.retry_multiplier = retry_multiplier
         self.retry_min_delay = retry_min_delay
@@ -49,8 +77,10 @@ class URLChecker:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
         }
         self._session: Optional[aiohttp.ClientSession] = None
+        # Семафор создаётся в __aenter__, когда уже существует event loop
+        self._sem: Optional[asyncio.Semaphore] = None
         self._metrics = {
-            "total_requests": 0,  # все попытки
+            "total_requests": 0,  # все проверки URL (без учёта повторных попыток)
             "unique_requests": 0,  # уникальные URL
             "successful_requests": 0,
             "failed_requests": 0,
@@ -60,176 +90,215 @@ class URLChecker:
             "other_errors": 0,
         }
         self._unique_urls = set()
+        # Кэш результатов и проверки, выполняющиеся в данный момент
+        self._result_cache: "OrderedDict[str, URLResponse]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[URLResponse]"] = {}
+        # Хост -> (количество неудач подряд, время первой неудачи)
+        self._host_failures: Dict[str, Tuple[int, float]] = {}
 
     async def __aenter__(self):
-        self._session = aiohttp.ClientSession(headers=self.headers)
+        # Пул keepalive-соединений и DNS-кэш позволяют переиспользовать
+        # TCP/TLS-соединения между проверками URL одного хоста
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=8,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            keepalive_timeout=30,
+            enable_cleanup_closed=True,
+        )
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._sem = asyncio.Semaphore(self.max_concurrency)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self._session:
             await self._session.close()
 
+    @property
+    def max_redirects_count(self) -> int:
+        """Максимальное количество редиректов"""
+        return self._request_kwargs["max_redirects"]
+
+    @max_redirects_count.setter
+    def max_redirects_count(self, value: int) -> None:
+        self._request_kwargs = {"allow_redirects": True, "max_redirects": value}
+
+    def reset(self) -> None:
+        """
+        Сбрасывает метрики, кэш результатов и счётчики неудач хостов перед
+        новой серией проверок; сессия и пул соединений сохраняются
+        """
+        for key in self._metrics:
+            self._metrics[key] = 0
+        self._unique_urls.clear()
+        self._result_cache.clear()
+        self._host_failures.clear()
+
     def get_metrics(self) -> Dict[str, int]:
         """Возвращает текущие метрики"""
         return self._metrics.copy()
 
+    def _is_host_unreachable(self, host: str) -> bool:
+        """Проверяет, набрал ли хост достаточно неудач подряд в текущем окне"""
+        failures = self._host_failures.get(host)
+        if failures is None:
+            return False
+        count, first_time = failures
+        if time.monotonic() - first_time > HOST_FAILURE_WINDOW:
+            del self._host_failures[host]
+            return False
+        return count >= HOST_FAILURE_THRESHOLD
+
+    def _record_host_failure(self, host: str) -> None:
+        """Учитывает таймаут или ошибку соединения для хоста"""
+        now = time.monotonic()
+        count, first_time = self._host_failures.get(host, (0, now))
+        if now - first_time > HOST_FAILURE_WINDOW:
+            count, first_time = 0, now
+        self._host_failures[host] = (count + 1, first_time)
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Экспоненциальная задержка перед повторной попыткой"""
+        return min(
+            self.retry_max_delay,
+            self.retry_min_delay * self.retry_multiplier ** (attempt - 1),
+        )
+
+    async def _send_request(self, url: Union[str, URL]) -> aiohttp.ClientResponse:
+        """
+        Отправляет HEAD-запрос и повторяет его методом GET, если сервер
+        не поддерживает HEAD. Тело ответа не читается.
+        """
+        if self.method == "HEAD":
+            response = await self._session.head(url, **self._request_kwargs)
+            if response.status not in HEAD_FALLBACK_STATUSES:
+                return response
+            response.release()
+        return await self._session.get(url, **self._request_kwargs)
+
+    async def check_url(self, url: str) -> URLResponse:
+        """
+        Проверяет доступность URL с повторными попытками и экспоненциальной задержкой
+        """
+        return await self._check_url(url, url, urlsplit(url).netloc)
+
+    async def check_url_parsed(self, url: URL) -> URLResponse:
+        """
+        Проверяет уже разобранный URL. Хост берётся из объекта URL,
+        а aiohttp не разбирает строку повторно.
+        """
+        return await self._check_url(str(url), url, url.raw_authority)
+
     async def _check_url(
-        self, url: str, retry_state: Optional[RetryCallState] = None
+        self, url: str, request_url: Union[str, URL], host: str
     ) -> URLResponse:
         """
-        Внутренняя функция для проверки URL с учётом retry_state от tenacity
+        Проверяет URL: url используется в результате и метриках,
+        request_url передаётся в aiohttp, host - ключ отрицательного кэша
         """
         if not self._session:
             raise RuntimeError(
                 "Session not initialized. Use async with context manager"
             )
 
-        self._metrics["total_requests"] += 1
-        if url not in self._unique_urls:
-            self._unique_urls.add(url)
+        unique_count = len(self._unique_urls)
+        self._unique_urls.add(url)
+        if len(self._unique_urls) > unique_count:
             self._metrics["unique_requests"] += 1
-        start_time = time.time()
-        retry_count = retry_state.attempt_number - 1 if retry_state else 0
 
-        try:
-            async with self._session.get(
-                url, timeout=self.timeout, allow_redirects=True, ssl=True, max_redirects=self.max_redirects_count
-            ) as response:
-                response_time = time.time() - start_time
-                self._metrics["successful_requests"] += 1
-                return URLResponse(
-                    url=url,
-                    status=response.status,
-                    is_available=200 <= response.status < 400,
-                    final_url=response.url,
-                    headers=dict(response.headers),
-                    content_type=response.headers.get("content-type"),
-                    response_time=response_time,
-                    retry_count=retry_count,
-                )
-        except asyncio.TimeoutError:
-            self._metrics["timeout_errors"] += 1
-            logger.warning(f"Timeout checking URL: {url}")
-            raise
-        except aiohttp.ClientError as e:
-            self._metrics["network_errors"] += 1
-            logger.error(f"Network error for URL {url}: {str(e)}")
-            raise
-        except ssl.SSLError as e:
-            self._metrics["ssl_errors"] += 1
-            logger.error(f"SSL error for URL {url}: {str(e)}")
+        if self._is_host_unreachable(host):
+            self._metrics["failed_requests"] += 1
             return URLResponse(
                 url=url,
                 status=0,
                 is_available=False,
                 final_url=None,
-                error=f"SSL error: {str(e)}",
-                response_time=time.time() - start_time,
-                retry_count=retry_count,
+                error="Host unreachable",
+                response_time=0.0,
+                retry_count=0
             )
-        except Exception as e:
-            self._metrics["other_errors"] += 1
-            logger.error(f"Unexpected error checking URL {url}: {str(e)}")
-            raise
-
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1.0, min=4.0, max=10.0),
-        retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
-        reraise=True,
-    )
-    async def check_url(self, url: str) -> URLResponse:
-        """
-        Проверяет доступность URL с повторными попытками (без tenacity)
-        """
-        if not self._session:
-            raise RuntimeError(
-                "Session not initialized. Use async with context manager"
-            )
-
-        if url not in self._unique_urls:
-            self._unique_urls.add(url)
-            self._metrics["unique_requests"] += 1
 
-        start_time = time.time()
+        self._metrics["total_requests"] += 1
+        start_time = time.monotonic()
         for attempt in range(1, self.max_retries + 1):
-            self._metrics["total_requests"] += 1
             retry_count = attempt - 1
             try:
-                # ВАЖНО: self._session.get() является корутиной, которая возвращает ClientResponse.
+                # ВАЖНО: self._session.head()/get() является корутиной, которая возвращает ClientResponse.
                 # ClientResponse - это асинхронный контекстный менеджер.
-                # Если exploding_get_method (которым заменен self._session.get в тесте)
-                # при вызове через await выбрасывает исключение (например, TooManyRedirects),
+                # Если запрос при вызове через await выбрасывает исключение (например, TooManyRedirects),
                 # то это исключение должно быть поймано одним из блоков except ниже,
                 # и код НЕ ДОЛЖЕН дойти до "async with ...".
-                response_object = await self._session.get(url, timeout=self.timeout, allow_redirects=True, ssl=True, max_redirects=self.max_redirects_count)
+                response_object = await self._send_request(request_url)
                 async with response_object as response:
-                    response_time = time.time() - start_time
-                    self._metrics["successful_requests"] += 1
-                    return URLResponse(
+                    response_time = time.monotonic() - start_time
+                    result = URLResponse(
                         url=url,
                         status=response.status,
                         is_available=200 <= response.status < 400,
-                        final_url=str(response.url) if response.url else None, # type: ignore # Явное преобразование в str
-                        headers=dict(response.headers), # type: ignore
+                        final_url=str(response.url), # aiohttp уже разобрал и проверил URL, повторная валидация не нужна
+                        headers=dict(response.headers) if self.include_headers else None, # type: ignore
                         content_type=response.headers.get("content-type"), # type: ignore
                         response_time=response_time,
                         retry_count=retry_count
                     )
+                    # Тело не нужно: освобождаем соединение сразу, не дожидаясь выхода из контекста
+                    response.release()
+                self._metrics["successful_requests"] += 1
+                self._host_failures.pop(host, None)
+                return result
             except aiohttp.TooManyRedirects as e_redirect:
-                logger.warning(f"DEBUG: checker.py caught TooManyRedirects: {type(e_redirect).__name__} - {str(e_redirect)}")
                 self._metrics["failed_requests"] += 1 
-                logger.warning(f"Too many redirects for URL {url}: {str(e_redirect)}")
+                logger.warning("Too many redirects for URL %s: %s", url, e_redirect)
                 return URLResponse(
                     url=url,
                     status=0, 
                     is_available=False,
                     final_url=None, 
                     error=f"Too many redirects: {str(e_redirect)}",
-                    response_time=time.time() - start_time,
+                    response_time=time.monotonic() - start_time,
                     retry_count=retry_count 
                 )
-            except (asyncio.TimeoutError, aiohttp.ClientError) as e_client: # TooManyRedirects НАСЛЕДУЕТСЯ от ClientError
-                # Если это TooManyRedirects, оно должно было быть поймано выше.
-                if isinstance(e_client, aiohttp.TooManyRedirects):
-                     # Эта ветка не должна достигаться, если блок выше работает правильно
-                    logger.error(f"DEBUG: checker.py TooManyRedirects slipped into ClientError block: {type(e_client).__name__} - {str(e_client)}")
-                    # Обработаем как TooManyRedirects, чтобы тест мог пройти, если он сюда попадет
-                    self._metrics["failed_requests"] += 1
-                    return URLResponse(url=url, status=0, is_available=False, final_url=None, error=f"Too many redirects (caught in ClientError): {str(e_client)}", response_time=time.time() - start_time, retry_count=retry_count)
-
-                logger.warning(f"DEBUG: checker.py caught TimeoutError/ClientError: {type(e_client).__name__} - {str(e_client)}")
+            except self._RETRYABLE_EXC as e_client:
                 if attempt == self.max_retries:
                     if isinstance(e_client, asyncio.TimeoutError):
                         self._metrics["timeout_errors"] += 1
                     else: # Другие ClientError
                         self._metrics["network_errors"] += 1
+                    if isinstance(e_client, (asyncio.TimeoutError, aiohttp.ClientConnectorError)):
+                        self._record_host_failure(host)
                     self._metrics["failed_requests"] += 1
                     error_msg = "Timeout" if isinstance(e_client, asyncio.TimeoutError) else f"Network error: {str(e_client)}"
                     return URLResponse(
                         url=url, status=0, is_available=False, final_url=None, error=error_msg,
-                        response_time=time.time() - start_time, retry_count=self.max_retries
+                        response_time=time.monotonic() - start_time, retry_count=self.max_retries
                     )
-                logger.info(f"Retrying URL {url} due to {type(e_client).__name__} (attempt {attempt+1}/{self.max_retries})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Retrying URL %s due to %s (attempt %s/%s)", url, type(e_client).__name__, attempt+1, self.max_retries)
+                await asyncio.sleep(self._retry_delay(attempt))
                 continue
             except ssl.SSLError as e_ssl:
-                logger.warning(f"DEBUG: checker.py caught SSLError: {type(e_ssl).__name__} - {str(e_ssl)}")
                 self._metrics["ssl_errors"] += 1
-                logger.error(f"SSL error for URL {url}: {str(e_ssl)}")
+                logger.error("SSL error for URL %s: %s", url, e_ssl)
                 return URLResponse(
                     url=url, status=0, is_available=False, final_url=None, error=f"SSL error: {str(e_ssl)}",
-                    response_time=time.time() - start_time, retry_count=retry_count
+                    response_time=time.monotonic() - start_time, retry_count=retry_count
                 )
             except Exception as e_gen:
-                logger.warning(f"DEBUG: checker.py caught generic Exception: {type(e_gen).__name__} - {str(e_gen)} ({e_gen.args})")
                 self._metrics["other_errors"] += 1
-                logger.error(f"Unexpected error checking URL {url}: {str(e_gen)}")
+                logger.error("Unexpected error checking URL %s: %s", url, e_gen)
                 if attempt == self.max_retries:
                     return URLResponse(
                         url=url, status=0, is_available=False, final_url=None, error=str(e_gen),
-                        response_time=time.time() - start_time, retry_count=self.max_retries
+                        response_time=time.monotonic() - start_time, retry_count=self.max_retries
                     )
-                logger.info(f"Retrying URL {url} due to generic Exception {type(e_gen).__name__} (attempt {attempt+1}/{self.max_retries})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Retrying URL %s due to generic Exception %s (attempt %s/%s)", url, type(e_gen).__name__, attempt+1, self.max_retries)
+                await asyncio.sleep(self._retry_delay(attempt))
                 continue
         # Если цикл завершился без return (что маловероятно)
         self._metrics["failed_requests"] += 1
@@ -239,16 +308,53 @@ class URLChecker:
             is_available=False,
             final_url=None,
             error="Unknown error",
-            response_time=time.time() - start_time,
+            response_time=time.monotonic() - start_time,
             retry_count=self.max_retries
         )
 
     async def safe_check_url(self, url: str) -> URLResponse:
         """
-        Безопасная проверка URL с обработкой всех ошибок
+        Безопасная проверка URL с обработкой всех ошибок.
+        Одновременно выполняется не более max_concurrency проверок.
+        Повторные проверки одного и того же URL берутся из кэша.
         """
+        if not self._sem:
+            raise RuntimeError(
+                "Session not initialized. Use async with context manager"
+            )
+
+        cached = self._result_cache.get(url)
+        if cached is not None:
+            self._result_cache.move_to_end(url)
+            return cached
+
+        inflight = self._inflight.get(url)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[URLResponse]" = loop.create_future()
+        self._inflight[url] = future
         try:
-            return await self.check_url(url)
+            result = await self._guarded_check_url(url)
+            future.set_result(result)
+        finally:
+            del self._inflight[url]
+            if not future.done():
+                future.cancel()
+
+        self._result_cache[url] = result
+        if len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+        return result
+
+    async def _guarded_check_url(self, url: str) -> URLResponse:
+        """
+        Проверяет URL под семафором, преобразуя исключения в URLResponse
+        """
+        try:
+            async with self._sem:
+                return await self.check_url(url)
         except Exception as e:
             self._metrics["failed_requests"] += 1
             return URLResponse(
@@ -271,4 +377,16 @@ class URLChecker:
             list[URLResponse]: Список результатов проверки
         """
         tasks = [self.safe_check_url(url) for url in urls]
-        return await asyncio.gather(*tasks)
+        # return_exceptions=True: ошибка одной задачи не отменяет остальные
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return [
+            result if isinstance(result, URLResponse) else URLResponse(
+                url=url,
+                status=0,
+                is_available=False,
+                final_url=None,
+                error=str(result),
+                retry_count=self.max_retries
+            )
+            for url, result in zip(urls, results)
+        ]
@@ -1,17 +1,16 @@
 """
 @file: content_processor.py
-@description: Модуль для многопоточной обработки URL и генерации markdown
-@dependencies: threading, queue, ProcessingTracker, MarkdownGenerator
+@description: Модуль для асинхронной обработки URL и генерации markdown
+@dependencies: asyncio, threading, ProcessingTracker, MarkdownGenerator
 @created: 2024-03-21
 """
 
-import queue
+import asyncio
 import threading
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import logging
-import time
 from urllib.parse import urlparse
 import hashlib
 
@@ -20,6 +19,32 @@ from .processing_tracker import ProcessingTracker
 
 logger = logging.getLogger(__name__)
 
+# Состояние трекера записывается на диск после каждых N обработанных URL
+TRACKER_FLUSH_INTERVAL = 64
+
+
+class _SafeTitleTable(dict):
+    """
+    Таблица для str.translate: буквы, цифры, пробел, '-' и '_' сохраняются,
+    остальные символы заменяются на '_'. Решение для каждого символа
+    вычисляется один раз и кэшируется.
+    """
+
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        value = char if char.isalnum() or char in " -_" else "_"
+        self[code] = value
+        return value
+
+
+_SAFE_TITLE_TABLE = _SafeTitleTable()
+
+
+def _url_hash(url: str) -> str:
+    """Короткий некриптографический хэш URL для имени файла (16 hex-символов)."""
+    return hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+
+
 class ContentProcessor:
     """Класс для обработки контента."""
 
@@ -29,22 +54,43 @@ class ContentProcessor:
 
         Args:
             results_dir: Директория для результатов
-            max_workers: Максимальное количество рабочих потоков
+            max_workers: Максимальное количество одновременно обрабатываемых URL
         """
         self.logger = logging.getLogger(__name__)
-        self.logger.info(f"[PROCESSOR] Инициализация ContentProcessor: {results_dir}, max_workers: {max_workers}")
+        self.logger.info("[PROCESSOR] Инициализация ContentProcessor: %s, max_workers: %s", results_dir, max_workers)
 
         self.results_dir = Path(results_dir)
         self.max_workers = max_workers
         self.tracker = ProcessingTracker(self.results_dir)
-        self.markdown_generator = MarkdownGenerator()
-        
-        self.queue = queue.Queue()
-        self.queue_thread = None
+        # Копии страниц с ETag/Last-Modified для условных запросов при повторной обработке
+        self.markdown_generator = MarkdownGenerator(cache_dir=self.results_dir / "html")
+
+        # Очередь и рабочие задачи живут в event loop отдельного потока,
+        # чтобы add_url/start_processing/stop_processing можно было вызывать из GUI
+        self.queue: Optional[asyncio.Queue] = None
+        self.queue_thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        # URL, добавленные или не обработанные, пока обработка остановлена
+        self._pending_urls: List[str] = []
+        self._processed_count = 0
         self.is_running = False
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # generate_markdown выполняет синхронный сетевой и файловый ввод-вывод;
+        # пул создается при запуске обработки и закрывается при остановке
+        self.executor: Optional[ThreadPoolExecutor] = None
         self._lock = threading.RLock()
+        # Сбрасывается из потока GUI, проверяется в потоке event loop
         self.stop_event = threading.Event()
+        # Установлено, пока рабочие задачи обрабатывают очередь
+        self.queue_thread_started = threading.Event()
+        # Установлено, когда нет URL в очереди, в обработке и отложенных
+        self.idle_event = threading.Event()
+        self.idle_event.set()
+        self._unfinished = 0
+        # Отложенные URL и счетчик необработанных URL защищены отдельной
+        # блокировкой: stop_processing ожидает рабочие задачи, удерживая
+        # self._lock, а рабочие задачи откладывают пропущенные URL
+        self._pending_lock = threading.Lock()
 
         self.logger.info("[PROCESSOR] Инициализация ContentProcessor завершена")
 
@@ -56,14 +102,24 @@ class ContentProcessor:
             url: URL для обработки
             title: Заголовок страницы
         """
-        self.logger.info(f"[PROCESSOR] Добавление URL: {url}, title: {title}")
+        self.logger.debug("[PROCESSOR] Добавление URL: %s, title: %s", url, title)
         
         with self._lock:
             # Добавляем URL в трекер
             self.tracker.add_url(url, title or "")
+            # Повторно добавленный URL загружается заново
+            self.markdown_generator.invalidate(url)
             
-            # Добавляем URL в очередь
-            self.queue.put(url)
+            # Добавляем URL в очередь (или откладываем до запуска обработки)
+            if self.is_running:
+                with self._pending_lock:
+                    self._unfinished += 1
+                    self.idle_event.clear()
+                self._loop.call_soon_threadsafe(self.queue.put_nowait, url)
+            else:
+                with self._pending_lock:
+                    self._pending_urls.append(url)
+                    self.idle_event.clear()
 
     def start_processing(self) -> None:
         """Запускает обработку URL."""
@@ -77,21 +133,34 @@ class ContentProcessor:
             # Сбрасываем событие остановки
             self.stop_event.clear()
 
-            # Создаем поток для обработки очереди
-            self.logger.info("[PROCESSOR] Создание потока очереди")
-            self.queue_thread = threading.Thread(target=self._process_queue)
-            self.queue_thread.daemon = True
-
             # Загружаем ожидающие URL
             self.logger.info("[PROCESSOR] Загрузка ожидающих URL")
-            pending_urls = self.tracker.get_pending_urls()
-            self.logger.info(f"[PROCESSOR] Найдено ожидающих URL: {len(pending_urls)}")
+            self.queue = asyncio.Queue()
+            with self._pending_lock:
+                deferred, self._pending_urls = self._pending_urls, []
+            pending_urls = list(dict.fromkeys(deferred + self.tracker.get_pending_urls()))
+            self.logger.info("[PROCESSOR] Найдено ожидающих URL: %s", len(pending_urls))
             for url in pending_urls:
-                self.queue.put(url)
+                self.queue.put_nowait(url)
+            with self._pending_lock:
+                self._unfinished = len(pending_urls)
+                if pending_urls:
+                    self.idle_event.clear()
+                else:
+                    self.idle_event.set()
+
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+            # Создаем поток с event loop для обработки очереди
+            self.logger.info("[PROCESSOR] Создание потока очереди")
+            self._loop = asyncio.new_event_loop()
+            self.queue_thread = threading.Thread(target=self._run_loop, args=(self._loop,))
+            self.queue_thread.daemon = True
 
             # Запускаем обработку
             self.is_running = True
             self.queue_thread.start()
+            asyncio.run_coroutine_threadsafe(self._start_workers(), self._loop)
             self.logger.info("[PROCESSOR] Обработка запущена")
 
     def stop_processing(self) -> None:
@@ -103,36 +172,31 @@ class ContentProcessor:
                 self.logger.warning("[PROCESSOR] Обработка уже остановлена")
                 return
 
-            # Устанавливаем событие остановки
-            self.stop_event.set()
-
             # Останавливаем обработку
             self.is_running = False
+            self.queue_thread_started.clear()
 
-            # Ожидаем завершения активных задач
+            # Устанавливаем событие остановки и ожидаем завершения активных задач
             self.logger.info("[PROCESSOR] Ожидание завершения активных задач")
-            self.executor.shutdown(wait=True)
+            asyncio.run_coroutine_threadsafe(self._stop_workers(), self._loop).result()
 
-            # Создаем новый executor
-            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            # Рабочие задачи завершены, пул потоков больше не нужен
+            self.executor.shutdown(wait=True)
+            self.executor = None
 
             # Ожидаем завершения потока очереди
             self.logger.info("[PROCESSOR] Ожидание завершения потока очереди")
+            self._loop.call_soon_threadsafe(self._loop.stop)
             if self.queue_thread:
                 self.queue_thread.join()
                 self.queue_thread = None
+            self._loop = None
 
-            # Очищаем очередь
-            self.logger.info("[PROCESSOR] Очистка очереди")
-            while not self.queue.empty():
-                try:
-                    self.queue.get_nowait()
-                except queue.Empty:
-                    break
+            self.queue = None
 
             self.logger.info("[PROCESSOR] Обработка остановлена")
 
-    def process_url(self, url: str) -> bool:
+    async def process_url(self, url: str) -> bool:
         """
         Обрабатывает URL.
 
@@ -142,65 +206,113 @@ class ContentProcessor:
         Returns:
             bool: True если обработка успешна, False в случае ошибки
         """
-        self.logger.info(f"[PROCESSOR] Обработка URL: {url}")
+        self.logger.debug("[PROCESSOR] Обработка URL: %s", url)
 
         try:
             # Проверяем событие остановки
             if self.stop_event.is_set():
-                self.logger.info(f"[PROCESSOR] Пропуск обработки URL {url} из-за остановки")
+                self.logger.debug("[PROCESSOR] Пропуск обработки URL %s из-за остановки", url)
+                with self._pending_lock:
+                    self._pending_urls.append(url)
                 return False
 
             # Генерируем имя файла
-            filename = hashlib.md5(url.encode()).hexdigest() + ".md"
+            filename = _url_hash(url) + ".md"
             save_path = Path(self.results_dir) / filename
 
-            # Обновляем статус
-            self.tracker.update_url_status(url, "processing")
+            # Отмечаем начало обработки (без записи на диск)
+            self.tracker.mark_processing(url)
 
             # Генерируем markdown
-            result = self.markdown_generator.generate_markdown(url, str(save_path))
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self.executor,
+                self.markdown_generator.generate_markdown,
+                url,
+                str(save_path),
+            )
 
             if result:
                 # Обновляем статус и путь к файлу
-                self.tracker.update_url_status(url, "completed")
-                self.tracker.update_markdown_path(url, result)
-                self.logger.info(f"[PROCESSOR] URL обработан успешно: {url}")
+                self._finish_url(url, "completed", result)
+                self.logger.debug("[PROCESSOR] URL обработан успешно: %s", url)
                 return True
             else:
                 # Обновляем статус с ошибкой
-                self.tracker.update_url_status(url, "error")
-                self.logger.error(f"[PROCESSOR] Ошибка при обработке URL: {url}")
+                self._finish_url(url, "error")
+                self.logger.error("[PROCESSOR] Ошибка при обработке URL: %s", url)
                 return False
 
         except Exception as e:
-            self.logger.error(f"[PROCESSOR] Ошибка при обработке URL {url}: {str(e)}")
-            self.tracker.update_url_status(url, "error")
+            self.logger.error("[PROCESSOR] Ошибка при обработке URL %s: %s", url, e)
+            self._finish_url(url, "error")
             return False
 
-    def _process_queue(self) -> None:
-        """Обрабатывает URL из очереди."""
+    def _finish_url(self, url: str, status: str, markdown_path: Optional[Path] = None) -> None:
+        """
+        Сохраняет итоговый статус URL в трекере.
+        Запись на диск выполняется пакетно, раз в TRACKER_FLUSH_INTERVAL URL.
+        """
+        self.tracker.update_url(url, status, markdown_path)
+        self._processed_count += 1
+        if self._processed_count % TRACKER_FLUSH_INTERVAL == 0:
+            self.tracker.flush()
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        """Выполняет event loop обработчика в отдельном потоке."""
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _start_workers(self) -> None:
+        """Запускает рабочие задачи обработки очереди."""
         self.logger.info("[PROCESSOR] Запуск обработчика очереди")
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_workers)
+        ]
+        self.queue_thread_started.set()
 
-        while self.is_running and not self.stop_event.is_set():
-            try:
-                # Ожидаем URL из очереди
-                self.logger.info("[PROCESSOR] Ожидание URL из очереди...")
-                try:
-                    url = self.queue.get(timeout=1)
-                except queue.Empty:
-                    continue
-
-                # Обрабатываем URL
-                if not self.stop_event.is_set():
-                    self.executor.submit(self.process_url, url)
-
-            except Exception as e:
-                self.logger.error(f"[PROCESSOR] Ошибка в обработчике очереди: {str(e)}")
-                if not self.stop_event.is_set():
-                    time.sleep(1)  # Пауза перед следующей попыткой
+    async def _stop_workers(self) -> None:
+        """
+        Останавливает рабочие задачи обработки очереди.
 
+        Каждая задача получает сигнальное значение None и завершается после
+        обработки текущего URL; URL, оставшиеся в очереди, пропускаются
+        process_url и сохраняются до следующего запуска.
+        """
+        self.stop_event.set()
+        for _ in self._workers:
+            self.queue.put_nowait(None)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.tracker.close()
         self.logger.info("[PROCESSOR] Обработчик очереди остановлен")
 
+    async def _worker(self) -> None:
+        """Обрабатывает URL из очереди до получения сигнального значения None."""
+        while True:
+            url = await self.queue.get()
+            try:
+                if url is None:
+                    break
+                await self.process_url(url)
+                self._url_done()
+            finally:
+                self.queue.task_done()
+
+    def _url_done(self) -> None:
+        """
+        Уменьшает счетчик необработанных URL. URL, пропущенные из-за остановки,
+        остаются отложенными, поэтому idle_event после остановки не устанавливается.
+        """
+        with self._pending_lock:
+            self._unfinished -= 1
+            if not self._unfinished and not self._pending_urls:
+                self.idle_event.set()
+
     def _get_save_path(self, url: str, title: str) -> Path:
         """
         Создает путь для сохранения markdown файла.
@@ -213,8 +325,7 @@ class ContentProcessor:
             Path: Путь для сохранения
         """
         # Создаем безопасное имя файла из заголовка
-        safe_title = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in title)
-        safe_title = safe_title.strip().replace(' ', '_')
+        safe_title = title.translate(_SAFE_TITLE_TABLE).strip().replace(' ', '_')
         
         # Получаем домен из URL
         domain = urlparse(url).netloc
@@ -224,5 +335,5 @@ class ContentProcessor:
         domain_dir.mkdir(parents=True, exist_ok=True)
         
         # Создаем имя файла
-        filename = f"{safe_title}_{hashlib.md5(url.encode()).hexdigest()[:8]}.md"
+        filename = f"{safe_title}_{_url_hash(url)}.md"
         return domain_dir / filename
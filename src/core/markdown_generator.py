@@ -1,27 +1,217 @@
 """
 @file: markdown_generator.py
 @description: Модуль для генерации markdown файлов из URL
-@dependencies: requests, beautifulsoup4, pathlib, html2text
+@dependencies: requests, aiohttp, lxml, pathlib
 @created: 2024-03-20
 """
 
+import asyncio
+import codecs
+import functools
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
+import aiohttp
+import lxml.html
 import requests
-from bs4 import BeautifulSoup, Tag, NavigableString
+from lxml.html import HtmlElement
+from requests.adapters import HTTPAdapter
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Парсер HTML на C (libxml2); документ передаётся в байтах UTF-8, чтобы
+# объявление кодировки внутри страницы не мешало разбору
+_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+FETCH_TIMEOUT = 30
+# Максимальный размер загружаемой страницы и размер читаемого блока
+MAX_CONTENT_SIZE = 10 * 1024 * 1024
+FETCH_CHUNK_SIZE = 64 * 1024
+# Типы содержимого, для которых генерируется markdown
+_ALLOWED_CONTENT_TYPES = frozenset({'text/html', 'text/plain', 'application/xhtml+xml'})
+# Кодировка из заголовка Content-Type и из <meta> в начале документа
+_HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+# Размер пула соединений и число одновременных загрузок
+FETCH_POOL_SIZE = 64
+FETCH_LIMIT_PER_HOST = 8
+# Суммарный размер загруженных HTML страниц в кэше (символов); страницы
+# больше HTML_CACHE_MAX_PAGE не кэшируются
+HTML_CACHE_MAX_TOTAL = 16 * 1024 * 1024
+HTML_CACHE_MAX_PAGE = 512 * 1024
+
+# Префиксы ссылок и изображений, которые не нужно дополнять базовым URL
+_ABSOLUTE_LINK_PREFIXES = ('http://', 'https://', 'mailto:', 'tel:', '#')
+_ABSOLUTE_SRC_PREFIXES = ('http://', 'https://')
+
+# Служебные и навигационные блоки, которые не попадают в markdown
+_SKIPPED_TAGS = frozenset({
+    'script', 'style', 'nav', 'footer', 'aside', 'noscript', 'svg', 'iframe',
+})
+
+# Префиксы markdown для заголовков h1-h6
+_HEADING_PREFIXES: Dict[str, str] = {f'h{level}': '#' * level for level in range(1, 7)}
+
+# Строчные теги, содержимое которых обрамляется разметкой markdown
+_INLINE_WRAP: Dict[str, Tuple[str, str]] = {
+    'strong': ('**', '**'),
+    'b': ('**', '**'),
+    'em': ('*', '*'),
+    'i': ('*', '*'),
+    'code': ('`', '`'),
+    'pre': ('```\n', '\n```'),
+}
+
+
+def _content_type_allowed(content_type: Optional[str]) -> bool:
+    """Проверяет тип содержимого; ответ без Content-Type допускается."""
+    if not content_type:
+        return True
+    return content_type.split(';', 1)[0].strip().lower() in _ALLOWED_CONTENT_TYPES
+
+
+def _header_charset(content_type: Optional[str]) -> Optional[str]:
+    """Возвращает кодировку, явно указанную в заголовке Content-Type."""
+    if not content_type:
+        return None
+    match = _HEADER_CHARSET_RE.search(content_type)
+    return match.group(1) if match else None
+
+
+def _decode_html(data: bytes, charset: Optional[str]) -> str:
+    """
+    Декодирует страницу без определения кодировки по содержимому: кодировка
+    из заголовка, затем UTF-8, затем кодировка из <meta> в начале документа.
+
+    Args:
+        data: Тело ответа
+        charset: Кодировка из заголовка Content-Type
+
+    Returns:
+        str: HTML контент
+    """
+    if charset:
+        try:
+            return data.decode(codecs.lookup(charset).name, errors='replace')
+        except LookupError:
+            pass
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    match = _META_CHARSET_RE.search(data, 0, 4096)
+    if match:
+        try:
+            return data.decode(codecs.lookup(match.group(1).decode('ascii')).name, errors='replace')
+        except LookupError:
+            pass
+    return data.decode('utf-8', errors='replace')
+
+
+@functools.lru_cache(maxsize=256)
+def _base_prefix(base_url: str) -> str:
+    """
+    Возвращает схему и хост базового URL для абсолютных путей ссылок.
+    Базовый URL одинаков для всех ссылок страницы, поэтому разбирается один раз.
+
+    Args:
+        base_url: Базовый URL
+
+    Returns:
+        str: Строка вида scheme://netloc
+    """
+    parsed_base = urlparse(base_url)
+    return f"{parsed_base.scheme}://{parsed_base.netloc}"
+
+
 class MarkdownGenerator:
     """Класс для генерации markdown из HTML."""
     
-    def __init__(self):
-        """Инициализация генератора markdown."""
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
+        """
+        Инициализация генератора markdown.
+
+        Args:
+            cache_dir: Директория для загруженного HTML и его ETag/Last-Modified.
+                Если задана, повторные загрузки выполняются условными запросами
+        """
         self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # Общая сессия переиспользует TCP/TLS соединения между загрузками
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=FETCH_POOL_SIZE, pool_maxsize=FETCH_POOL_SIZE)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        # Асинхронная сессия создаётся при первой параллельной загрузке и
+        # привязана к циклу событий, в котором создана
+        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Загруженный HTML (LRU), ограниченный суммарным размером
+        self._html_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._html_cache_size = 0
+        self._cache_lock = threading.Lock()
+        # Обработчики тегов, результат которых добавляется в markdown целиком
+        self._tag_handlers: Dict[str, Callable[[HtmlElement, str], str]] = {
+            'table': lambda element, base_url: self._process_table(element),
+            'ul': lambda element, base_url: self._process_list(element),
+            'ol': lambda element, base_url: self._process_list(element),
+            'a': self._process_link,
+            'img': self._process_image,
+            'br': lambda element, base_url: '\n',
+            'hr': lambda element, base_url: '---\n',
+        }
+        for tag in _HEADING_PREFIXES:
+            self._tag_handlers[tag] = lambda element, base_url: self._process_heading(element)
+
+    def close(self) -> None:
+        """Закрывает HTTP сессию генератора."""
+        self._session.close()
+
+    async def aclose(self) -> None:
+        """Закрывает асинхронную HTTP сессию генератора."""
+        if self._async_session is not None:
+            await self._async_session.close()
+            self._async_session = None
+            self._async_loop = None
+
+    def _get_async_session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает общую асинхронную сессию для текущего цикла событий.
+
+        Returns:
+            aiohttp.ClientSession: Сессия с пулом соединений и DNS кэшем
+
+        Raises:
+            RuntimeError: Открытая сессия создана в другом цикле событий
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_session is not None and not self._async_session.closed:
+            if self._async_loop is not loop:
+                # Сессию нельзя ни использовать, ни закрыть из чужого цикла событий
+                raise RuntimeError(
+                    "Асинхронная сессия создана в другом цикле событий, "
+                    "закройте ее через aclose() перед сменой цикла"
+                )
+        else:
+            connector = aiohttp.TCPConnector(
+                limit=FETCH_POOL_SIZE,
+                limit_per_host=FETCH_LIMIT_PER_HOST,
+                ttl_dns_cache=300,
+            )
+            self._async_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT),
+            )
+            self._async_loop = loop
+        return self._async_session
 
     def generate_markdown(self, url: str, save_path: str) -> Optional[Path]:
         """
@@ -34,70 +224,187 @@ class MarkdownGenerator:
         Returns:
             Path: Путь к сохраненному файлу или None
         """
-        self.logger.info(f"[MARKDOWN] generate_markdown: {url}, save_path: {save_path}")
+        self.logger.debug("[MARKDOWN] generate_markdown: %s, save_path: %s", url, save_path)
 
-        try:
-            # Получаем HTML
+        tree = self.get_tree(url)
+        if tree is None:
+            return None
+        return self._write_markdown(url, tree, save_path)
+
+    def get_tree(self, url: str) -> Optional[HtmlElement]:
+        """
+        Возвращает разобранный HTML документ по URL, используя кэш загруженных
+        страниц.
+
+        Args:
+            url: URL страницы
+
+        Returns:
+            HtmlElement: Корневой элемент документа или None
+        """
+        with self._cache_lock:
+            html = self._html_cache.get(url)
+            if html is not None:
+                self._html_cache.move_to_end(url)
+
+        if html is None:
             html = self._fetch_content(url)
             if not html:
                 return None
+            self._remember_html(url, html)
 
-            # Создаем BeautifulSoup
-            soup = BeautifulSoup(html, 'html.parser')
+        return self._parse(html)
 
+    def _parse(self, html: str) -> Optional[HtmlElement]:
+        """
+        Разбирает HTML документ.
+
+        Args:
+            html: HTML страницы
+
+        Returns:
+            HtmlElement: Корневой элемент документа или None
+        """
+        try:
+            return lxml.html.document_fromstring(html.encode('utf-8'), parser=_HTML_PARSER)
+        except Exception as e:
+            self.logger.error("[MARKDOWN] Ошибка при разборе HTML: %s", e)
+            return None
+
+    def invalidate(self, url: str) -> None:
+        """
+        Удаляет URL из кэша загруженных страниц.
+
+        Args:
+            url: URL страницы
+        """
+        with self._cache_lock:
+            html = self._html_cache.pop(url, None)
+            if html is not None:
+                self._html_cache_size -= len(html)
+
+    def _remember_html(self, url: str, html: str) -> None:
+        """Сохраняет загруженный HTML в LRU кэше, вытесняя старые страницы по размеру."""
+        if len(html) > HTML_CACHE_MAX_PAGE:
+            return
+        with self._cache_lock:
+            previous = self._html_cache.pop(url, None)
+            if previous is not None:
+                self._html_cache_size -= len(previous)
+            self._html_cache[url] = html
+            self._html_cache_size += len(html)
+            while self._html_cache_size > HTML_CACHE_MAX_TOTAL:
+                _, evicted = self._html_cache.popitem(last=False)
+                self._html_cache_size -= len(evicted)
+
+    async def generate_many(self, items: List[Tuple[str, str]]) -> Dict[str, Optional[Path]]:
+        """
+        Загружает страницы параллельно и генерирует для них markdown.
+
+        Args:
+            items: Пары (URL страницы, путь для сохранения)
+
+        Returns:
+            Dict[str, Optional[Path]]: Путь к сохраненному файлу или None для каждого URL
+        """
+        contents = await self.fetch_many([url for url, _ in items])
+        results: Dict[str, Optional[Path]] = {}
+        for url, save_path in items:
+            html = contents.get(url)
+            # Загруженная страница разбирается напрямую: повторное обращение
+            # к кэшу приводило бы к синхронной загрузке некэшируемых страниц
+            if html:
+                self._remember_html(url, html)
+            tree = self._parse(html) if html else None
+            results[url] = self._write_markdown(url, tree, save_path) if tree is not None else None
+        return results
+
+    def _write_markdown(self, url: str, tree: HtmlElement, save_path: str) -> Optional[Path]:
+        """
+        Преобразует HTML документ в markdown и сохраняет его в файл.
+
+        Args:
+            url: URL страницы
+            tree: Корневой элемент документа
+            save_path: Путь для сохранения
+
+        Returns:
+            Path: Путь к сохраненному файлу или None
+        """
+        try:
             # Получаем заголовок и метаданные
-            title = self._get_title(soup)
-            description = self._get_meta(soup, "description")
-            keywords = self._get_meta(soup, "keywords")
-
-            # Формируем markdown
-            markdown = []
-            
-            # Добавляем заголовок
-            markdown.append(f"# {title}\n")
-            
-            # Добавляем метаданные
+            title = self._get_title(tree)
+            description = self._get_meta(tree, "description")
+            keywords = self._get_meta(tree, "keywords")
+
+            # Формируем markdown: заголовок и метаданные
+            header = [f"# {title}\n"]
             if description:
-                markdown.append(f"> {description}\n")
+                header.append(f"> {description}\n")
             if keywords:
-                markdown.append(f"**Ключевые слова**: {keywords}\n")
-            markdown.append(f"**Источник**: [{url}]({url})\n")
+                header.append(f"**Ключевые слова**: {keywords}\n")
+            header.append(f"**Источник**: [{url}]({url})\n")
 
-            # Обрабатываем основной контент
-            body = soup.find('body')
-            if body and isinstance(body, Tag):
-                markdown.append(self._process_content(body, url))
+            # Основной контент дописывается в тот же список фрагментов,
+            # документ собирается одним join
+            markdown = ['\n'.join(header)]
+            body = tree.find('body')
+            if body is not None:
+                markdown.append('\n')
+                self._render_content(self._get_main_content(body), url, markdown)
 
             # Сохраняем результат
             save_path_obj = Path(save_path)
             save_path_obj.parent.mkdir(parents=True, exist_ok=True)
-            save_path_obj.write_text('\n'.join(markdown))
+            save_path_obj.write_text(''.join(markdown))
 
             return save_path_obj
 
         except Exception as e:
-            self.logger.error(f"[MARKDOWN] Ошибка при генерации markdown: {e}")
+            self.logger.error("[MARKDOWN] Ошибка при генерации markdown: %s", e)
             return None
 
-    def _get_meta(self, soup: BeautifulSoup, name: str) -> Optional[str]:
+    def _get_main_content(self, body: HtmlElement) -> HtmlElement:
+        """
+        Возвращает область основного содержимого страницы: <main>, иначе
+        единственный <article>, иначе <body>.
+
+        Args:
+            body: Элемент <body>
+
+        Returns:
+            HtmlElement: Элемент, с которого начинается обход
+        """
+        articles: List[HtmlElement] = []
+        for element in body.iter('main', 'article'):
+            if element.tag == 'main':
+                return element
+            articles.append(element)
+        # Несколько статей - скорее всего лента, обрабатываем страницу целиком
+        if len(articles) == 1:
+            return articles[0]
+        return body
+
+    def _get_meta(self, tree: HtmlElement, name: str) -> Optional[str]:
         """
         Получает значение мета-тега.
 
         Args:
-            soup: BeautifulSoup объект
+            tree: Корневой элемент документа
             name: Имя мета-тега
 
         Returns:
             str: Значение мета-тега или None
         """
-        meta = soup.find('meta', {'name': name})
-        if meta and isinstance(meta, Tag):
-            content = meta.get('content')
-            if content and isinstance(content, str):
-                return content.strip()
+        for meta in tree.iter('meta'):
+            if meta.get('name') == name:
+                content = meta.get('content')
+                if content:
+                    return content.strip()
+                return None
         return None
 
-    def _process_content(self, element: Tag, base_url: str) -> str:
+    def _process_content(self, element: HtmlElement, base_url: str) -> str:
         """
         Обрабатывает HTML элемент и возвращает markdown.
 
@@ -108,42 +415,71 @@ class MarkdownGenerator:
         Returns:
             str: Markdown
         """
-        result = []
-        for child in element.children:
-            if isinstance(child, NavigableString):
-                if str(child).strip():
-                    result.append(str(child).strip())
-            elif isinstance(child, Tag):
-                if child.name == 'table':
-                    result.append(self._process_table(child))
-                elif child.name in ('ul', 'ol'):
-                    result.append(self._process_list(child))
-                elif child.name == 'a':
-                    result.append(self._process_link(child, base_url))
-                elif child.name == 'img':
-                    result.append(self._process_image(child, base_url))
-                elif child.name in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
-                    result.append(self._process_heading(child))
-                elif child.name == 'p':
-                    result.append(self._process_paragraph(child, base_url))
-                elif child.name == 'br':
-                    result.append('\n')
-                elif child.name == 'hr':
-                    result.append('---\n')
-                elif child.name in ('strong', 'b'):
-                    result.append(f"**{self._process_content(child, base_url)}**")
-                elif child.name in ('em', 'i'):
-                    result.append(f"*{self._process_content(child, base_url)}*")
-                elif child.name == 'code':
-                    result.append(f"`{self._process_content(child, base_url)}`")
-                elif child.name == 'pre':
-                    result.append(f"```\n{self._process_content(child, base_url)}\n```")
-                else:
-                    result.append(self._process_content(child, base_url))
+        out: List[str] = []
+        self._render_content(element, base_url, out)
+        return ''.join(out)
 
-        return ' '.join(result)
+    def _render_content(self, element: HtmlElement, base_url: str, out: List[str]) -> None:
+        """
+        Добавляет markdown дочерних узлов элемента в общий список фрагментов.
+        Соседние фрагменты разделяются пробелом, строка собирается один раз
+        в _process_content. Дерево обходится без рекурсии, с явным стеком.
 
-    def _process_table(self, table: Tag) -> str:
+        Args:
+            element: HTML элемент
+            base_url: Базовый URL
+            out: Список фрагментов markdown
+        """
+        # Стек родительских уровней: итератор по детям, начало фрагментов уровня,
+        # закрывающая разметка и элемент, в который выполнен спуск
+        stack: List[Tuple[Iterator[HtmlElement], int, str, HtmlElement]] = []
+        children = iter(element)
+        start = len(out)
+        text = element.text.strip() if element.text else ''
+        if text:
+            out.append(text)
+
+        while True:
+            child = next(children, None)
+            if child is None:
+                if not stack:
+                    return
+                # Элемент обработан: закрываем разметку и возвращаемся к родителю
+                children, start, close, child = stack.pop()
+                if close:
+                    out.append(close)
+            # Комментарии и инструкции обработки не являются тегами: их tag - функция,
+            # а не строка. Тег читается один раз, проверка типа - по идентичности.
+            # Пропущенные блоки не обходятся, но текст после них сохраняется
+            elif type(tag := child.tag) is str and tag not in _SKIPPED_TAGS:
+                if len(out) > start:
+                    out.append(' ')
+                handler = self._tag_handlers.get(tag)
+                if handler is not None:
+                    out.append(handler(child, base_url))
+                else:
+                    wrap = _INLINE_WRAP.get(tag)
+                    if wrap is not None:
+                        out.append(wrap[0])
+                        close = wrap[1]
+                    else:
+                        close = '\n\n' if tag == 'p' else ''
+                    stack.append((children, start, close, child))
+                    children = iter(child)
+                    start = len(out)
+                    text = child.text.strip() if child.text else ''
+                    if text:
+                        out.append(text)
+                    # Текст после элемента добавляется после обхода его детей
+                    continue
+            # Текст после закрывающего тега хранится в tail дочернего элемента
+            tail = child.tail.strip() if child.tail else ''
+            if tail:
+                if len(out) > start:
+                    out.append(' ')
+                out.append(tail)
+
+    def _process_table(self, table: HtmlElement) -> str:
         """
         Обрабатывает HTML таблицу.
 
@@ -153,21 +489,23 @@ class MarkdownGenerator:
         Returns:
             str: Markdown таблица
         """
-        result = []
-        headers = []
-        rows = []
+        result: List[str] = []
+        headers: List[str] = []
+        rows: List[List[str]] = []
 
         # Обрабатываем заголовки
-        header_row = table.find('tr')
-        if header_row and isinstance(header_row, Tag):
-            for th in header_row.find_all(['th', 'td']):
-                headers.append(th.get_text().strip())
+        table_rows = list(table.iter('tr'))
+        if table_rows:
+            for th in table_rows[0]:
+                if th.tag in ('th', 'td'):
+                    headers.append(th.text_content().strip())
 
         # Обрабатываем строки
-        for tr in table.find_all('tr')[1:]:
-            row = []
-            for td in tr.find_all('td'):
-                row.append(td.get_text().strip())
+        for tr in table_rows[1:]:
+            row: List[str] = []
+            for td in tr:
+                if td.tag == 'td':
+                    row.append(td.text_content().strip())
             if row:
                 rows.append(row)
 
@@ -181,7 +519,7 @@ class MarkdownGenerator:
 
         return '\n'.join(result) + '\n\n'
 
-    def _process_list(self, list_tag: Tag, level: int = 0, parent_counter: Optional[int] = None) -> str:
+    def _process_list(self, list_tag: HtmlElement, level: int = 0, parent_counter: Optional[int] = None) -> str:
         """
         Обрабатывает HTML список.
 
@@ -193,29 +531,36 @@ class MarkdownGenerator:
         Returns:
             str: Markdown список
         """
-        result = []
-        is_ordered = list_tag.name == 'ol'
+        result: List[str] = []
+        is_ordered = list_tag.tag == 'ol'
         counter = 1
 
         # Учитываем атрибут start для нумерованных списков
         if is_ordered:
             start_attr = list_tag.get('start')
-            if start_attr and isinstance(start_attr, str):
+            if start_attr:
                 try:
                     counter = int(start_attr)
                 except (ValueError, TypeError):
                     pass
 
-        for item in list_tag.find_all('li', recursive=False):
+        for item in list_tag:
+            if item.tag != 'li':
+                continue
             # Обрабатываем вложенные списки
-            nested_lists = []
-            for nested_list in item.find_all(['ul', 'ol'], recursive=False):
-                nested_content = self._process_list(nested_list, level + 1, counter if is_ordered else None)
-                nested_lists.append(nested_content)
-                nested_list.extract()  # Удаляем вложенный список из родительского элемента
-
-            # Получаем текст элемента списка
-            item_text = item.get_text().strip()
+            nested_lists: List[str] = []
+            item_parts: List[str] = [item.text or '']
+            for child in item:
+                tag = child.tag
+                if tag in ('ul', 'ol'):
+                    nested_content = self._process_list(child, level + 1, counter if is_ordered else None)
+                    nested_lists.append(nested_content)
+                elif type(tag) is str:
+                    item_parts.append(child.text_content())
+                item_parts.append(child.tail or '')
+
+            # Получаем текст элемента списка без вложенных списков
+            item_text = ''.join(item_parts).strip()
 
             # Формируем строку списка
             indent = '  ' * level  # Используем 2 пробела для отступа
@@ -229,8 +574,9 @@ class MarkdownGenerator:
             for nested_list in nested_lists:
                 result.append(nested_list.rstrip())
 
+        return '\n'.join(result) + '\n\n'
 
-    def _process_link(self, link: Tag, base_url: str) -> str:
+    def _process_link(self, link: HtmlElement, base_url: str) -> str:
         """
         Обрабатывает HTML ссылку.
 
@@ -242,25 +588,24 @@ class MarkdownGenerator:
             str: Markdown ссылка
         """
         href = link.get('href', '')
-        if not href or not isinstance(href, str):
-            return link.get_text()
+        if not href:
+            return link.text_content()
 
         # Пропускаем javascript: ссылки
         if href.startswith('javascript:'):
-            return link.get_text()
+            return link.text_content()
 
         # Обрабатываем относительные ссылки
-        if not href.startswith(('http://', 'https://', 'mailto:', 'tel:', '#')):
+        if not href.startswith(_ABSOLUTE_LINK_PREFIXES):
             if href.startswith('/'):
-                parsed_base = urlparse(base_url)
-                href = f"{parsed_base.scheme}://{parsed_base.netloc}{href}"
+                href = _base_prefix(base_url) + href
             else:
                 href = urljoin(base_url, href)
 
-        text = link.get_text().strip() or href
+        text = link.text_content().strip() or href
         return f"[{text}]({href})"
 
-    def _process_image(self, img: Tag, base_url: str) -> str:
+    def _process_image(self, img: HtmlElement, base_url: str) -> str:
         """
         Обрабатывает HTML изображение.
 
@@ -272,23 +617,20 @@ class MarkdownGenerator:
             str: Markdown изображение
         """
         src = img.get('src', '')
-        if not src or not isinstance(src, str):
+        if not src:
             return ''
 
         # Обрабатываем относительные пути
-        if not src.startswith(('http://', 'https://')):
+        if not src.startswith(_ABSOLUTE_SRC_PREFIXES):
             if src.startswith('/'):
-                parsed_base = urlparse(base_url)
-                src = f"{parsed_base.scheme}://{parsed_base.netloc}{src}"
+                src = _base_prefix(base_url) + src
             else:
                 src = urljoin(base_url, src)
 
         alt = img.get('alt', 'image')
-        if not isinstance(alt, str):
-            alt = 'image'
         return f"![{alt}]({src})"
 
-    def _process_heading(self, heading: Tag) -> str:
+    def _process_heading(self, heading: HtmlElement) -> str:
         """
         Обрабатывает HTML заголовок.
 
@@ -298,39 +640,88 @@ class MarkdownGenerator:
         Returns:
             str: Markdown заголовок
         """
-        level = int(heading.name[1])
-        return f"{'#' * level} {heading.get_text().strip()}\n\n"
+        return f"{_HEADING_PREFIXES[heading.tag]} {heading.text_content().strip()}\n\n"
 
-    def _process_paragraph(self, paragraph: Tag, base_url: str) -> str:
+    def _get_title(self, tree: HtmlElement) -> str:
         """
-        Обрабатывает HTML параграф.
+        Получает заголовок страницы.
 
         Args:
-            paragraph: HTML параграф
-            base_url: Базовый URL
+            tree: Корневой элемент документа
 
         Returns:
-            str: Markdown параграф
+            str: Заголовок страницы
         """
-        return f"{self._process_content(paragraph, base_url)}\n\n"
+        # Один проход по документу: <title> имеет приоритет, иначе первый <h1>
+        h1 = None
+        for element in tree.iter('title', 'h1'):
+            if element.tag == 'title':
+                return element.text_content().strip()
+            if h1 is None:
+                h1 = element
+        if h1 is not None:
+            return h1.text_content().strip()
+        return "Untitled"
 
-    def _get_title(self, soup: BeautifulSoup) -> str:
+    async def fetch_many(self, urls: List[str]) -> Dict[str, Optional[str]]:
         """
-        Получает заголовок страницы.
+        Параллельно получает HTML контент для списка URL через общий пул соединений.
+        Сессия сохраняется между вызовами и закрывается методом aclose.
 
         Args:
-            soup: BeautifulSoup объект
+            urls: Список URL
 
         Returns:
-            str: Заголовок страницы
+            Dict[str, Optional[str]]: HTML контент или None для каждого URL
         """
-        title = soup.find('title')
-        if title:
-            return title.get_text().strip()
-        h1 = soup.find('h1')
-        if h1:
-            return h1.get_text().strip()
-        return "Untitled"
+        unique_urls = list(dict.fromkeys(urls))
+        semaphore = asyncio.Semaphore(FETCH_POOL_SIZE)
+        session = self._get_async_session()
+
+        async def fetch(url: str) -> Optional[str]:
+            async with semaphore:
+                return await self._fetch_content_async(session, url)
+
+        contents = await asyncio.gather(*(fetch(url) for url in unique_urls))
+        return dict(zip(unique_urls, contents))
+
+    async def _fetch_content_async(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """
+        Асинхронно получает HTML контент по URL.
+
+        Args:
+            session: HTTP сессия aiohttp
+            url: URL страницы
+
+        Returns:
+            str: HTML контент или None
+        """
+        self.logger.debug("[MARKDOWN] _fetch_content_async: %s", url)
+        try:
+            # Файлы сохранённой копии читаются и пишутся вне цикла событий
+            headers = await asyncio.to_thread(self._conditional_headers, url)
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return await asyncio.to_thread(self._load_page, url)
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type')
+                if not _content_type_allowed(content_type):
+                    self.logger.warning("[MARKDOWN] Неподдерживаемый тип содержимого %s: %s", content_type, url)
+                    return None
+                data = bytearray()
+                async for chunk in response.content.iter_chunked(FETCH_CHUNK_SIZE):
+                    data += chunk
+                    if len(data) > MAX_CONTENT_SIZE:
+                        self.logger.warning("[MARKDOWN] Страница больше %d байт: %s", MAX_CONTENT_SIZE, url)
+                        return None
+                html = _decode_html(bytes(data), _header_charset(content_type))
+                await asyncio.to_thread(
+                    self._store_page, url, html, response.headers.get('ETag'), response.headers.get('Last-Modified')
+                )
+                return html
+        except Exception as e:
+            self.logger.error("[MARKDOWN] Ошибка при получении контента: %s", e)
+            return None
 
     def _fetch_content(self, url: str) -> Optional[str]:
         """
@@ -342,11 +733,103 @@ class MarkdownGenerator:
         Returns:
             str: HTML контент или None
         """
-        self.logger.info(f"[MARKDOWN] _fetch_content: {url}")
+        self.logger.debug("[MARKDOWN] _fetch_content: %s", url)
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            return response.text
+            headers = self._conditional_headers(url)
+            # Тело читается блоками, чтобы не загружать слишком большие страницы
+            with self._session.get(url, timeout=FETCH_TIMEOUT, headers=headers, stream=True) as response:
+                # Страница не изменилась с прошлой загрузки
+                if response.status_code == 304:
+                    return self._load_page(url)
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type')
+                if not _content_type_allowed(content_type):
+                    self.logger.warning("[MARKDOWN] Неподдерживаемый тип содержимого %s: %s", content_type, url)
+                    return None
+                data = bytearray()
+                for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+                    data += chunk
+                    if len(data) > MAX_CONTENT_SIZE:
+                        self.logger.warning("[MARKDOWN] Страница больше %d байт: %s", MAX_CONTENT_SIZE, url)
+                        return None
+                html = _decode_html(bytes(data), _header_charset(content_type))
+            self._store_page(url, html, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return html
         except Exception as e:
-            self.logger.error(f"[MARKDOWN] Ошибка при получении контента: {e}")
+            self.logger.error("[MARKDOWN] Ошибка при получении контента: %s", e)
+            return None
+
+    @staticmethod
+    def _page_paths(cache_dir: Path, url: str) -> Tuple[Path, Path]:
+        """Возвращает пути к сохранённому HTML и его метаданным."""
+        name = hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+        return cache_dir / f"{name}.html", cache_dir / f"{name}.json"
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Формирует заголовки условного запроса по метаданным сохранённой копии страницы.
+
+        Args:
+            url: URL страницы
+
+        Returns:
+            Dict[str, str]: Заголовки запроса
+        """
+        if self.cache_dir is None:
+            return {}
+        html_path, meta_path = self._page_paths(self.cache_dir, url)
+        # Сам HTML читается только при ответе 304
+        if not html_path.exists():
+            return {}
+        try:
+            meta: Dict[str, Any] = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        headers: Dict[str, str] = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def _load_page(self, url: str) -> Optional[str]:
+        """
+        Читает сохранённую копию страницы.
+
+        Args:
+            url: URL страницы
+
+        Returns:
+            str: HTML контент или None, если копия недоступна
+        """
+        if self.cache_dir is None:
+            return None
+        html_path, _ = self._page_paths(self.cache_dir, url)
+        try:
+            return html_path.read_text(encoding='utf-8')
+        except OSError as e:
+            self.logger.warning("[MARKDOWN] Не удалось прочитать копию страницы: %s", e)
             return None
+
+    def _store_page(self, url: str, html: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        Сохраняет HTML страницы и её ETag/Last-Modified для условных запросов.
+
+        Args:
+            url: URL страницы
+            html: HTML контент
+            etag: Значение заголовка ETag
+            last_modified: Значение заголовка Last-Modified
+        """
+        if self.cache_dir is None or not (etag or last_modified):
+            return
+        html_path, meta_path = self._page_paths(self.cache_dir, url)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            html_path.write_text(html, encoding='utf-8')
+            meta_path.write_text(
+                json.dumps({'url': url, 'etag': etag, 'last_modified': last_modified}, ensure_ascii=False),
+                encoding='utf-8',
+            )
+        except OSError as e:
+            self.logger.warning("[MARKDOWN] Не удалось сохранить копию страницы: %s", e)
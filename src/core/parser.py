@@ -1,10 +1,16 @@
 import json
 import logging
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from pydantic import BaseModel, HttpUrl
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,15 +28,19 @@ class Bookmark(BaseModel):
         children: Дочерние элементы для папок
     """
 
-    name: str
+    name: str = ""
     url: Optional[HttpUrl] = None
     date_added: Optional[str] = None
     parent_id: Optional[str] = None
-    id: str
-    type: str
+    id: str = ""
+    type: str = "url"
     children: Optional[List["Bookmark"]] = None
 
 
+# Валидация дерева закладок одним вызовом: pydantic v2 (model_validate) или v1 (parse_obj)
+_validate_bookmark = getattr(Bookmark, "model_validate", None) or Bookmark.parse_obj
+
+
 class BookmarksParser:
     """
     Парсер закладок из Chrome/Yandex Browser.
@@ -50,6 +60,8 @@ class BookmarksParser:
         """
         self.bookmarks_file = Path(bookmarks_file)
         self.max_file_size = max_file_size
+        # Данные корневой папки, общие для count_urls и iter_urls_fast
+        self._url_root: Optional[Dict[str, Any]] = None
 
     def validate_file(self) -> bool:
         """
@@ -78,21 +90,9 @@ class BookmarksParser:
         Returns:
             Bookmark: Объект закладки
         """
-        children = None
-        if "children" in bookmark_data:
-            children = [
-                self.parse_bookmark(child) for child in bookmark_data["children"]
-            ]
-
-        return Bookmark(
-            name=bookmark_data.get("name", ""),
-            url=bookmark_data.get("url"),
-            date_added=bookmark_data.get("date_added"),
-            parent_id=bookmark_data.get("parent_id"),
-            id=bookmark_data.get("id", ""),
-            type=bookmark_data.get("type", "url"),
-            children=children,
-        )
+        # Вложенные закладки проверяются pydantic за один проход, без
+        # построения промежуточных объектов на каждом уровне
+        return _validate_bookmark(bookmark_data)
 
     def parse(self) -> Optional[Bookmark]:
         """
@@ -101,20 +101,110 @@ class BookmarksParser:
         Returns:
             Optional[Bookmark]: Корневая закладка или None при ошибке
         """
+        root_data = self._load_root()
+        if root_data is None:
+            return None
+
+        try:
+            # Парсим корневую папку
+            return self.parse_bookmark(root_data)
+        except Exception as e:
+            logger.error(f"Unexpected error parsing bookmarks: {e}")
+            return None
+
+    def iter_urls_fast(self, unique: bool = False) -> Iterator[str]:
+        """
+        Перебирает URL закладок напрямую по данным JSON, без построения
+        и валидации объектов Bookmark.
+
+        Args:
+            unique: Пропускать повторяющиеся URL
+
+        Returns:
+            Iterator[str]: URL в порядке закладок
+        """
+        root_data = self._get_url_root()
+        if root_data is None:
+            return
+
+        seen = set()
+        stack = deque([root_data])
+        while stack:
+            node = stack.pop()
+            url = node.get("url")
+            if url and not (unique and url in seen):
+                if unique:
+                    seen.add(url)
+                yield url
+            children = node.get("children")
+            if children:
+                stack.extend(reversed(children))
+
+    def count_urls(self, unique: bool = False) -> int:
+        """
+        Подсчитывает URL закладок без построения их списка.
+
+        Args:
+            unique: Считать повторяющиеся URL один раз
+
+        Returns:
+            int: Количество URL
+        """
+        root_data = self._get_url_root()
+        if root_data is None:
+            return 0
+
+        count = 0
+        seen = set()
+        stack = [root_data]
+        while stack:
+            node = stack.pop()
+            url = node.get("url")
+            if url:
+                if unique:
+                    seen.add(url)
+                else:
+                    count += 1
+            children = node.get("children")
+            if children:
+                stack.extend(children)
+        return len(seen) if unique else count
+
+    def _get_url_root(self) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает данные корневой папки, читая файл один раз для
+        count_urls и iter_urls_fast.
+
+        Returns:
+            Optional[Dict[str, Any]]: Данные папки bookmark_bar или None при ошибке
+        """
+        if self._url_root is None:
+            self._url_root = self._load_root()
+        return self._url_root
+
+    def _load_root(self) -> Optional[Dict[str, Any]]:
+        """
+        Читает файл закладок и возвращает данные корневой папки.
+
+        Returns:
+            Optional[Dict[str, Any]]: Данные папки bookmark_bar или None при ошибке
+        """
         if not self.validate_file():
             return None
 
         try:
-            with open(self.bookmarks_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            if orjson is not None:
+                # orjson.JSONDecodeError наследуется от json.JSONDecodeError
+                data = orjson.loads(self.bookmarks_file.read_bytes())
+            else:
+                with open(self.bookmarks_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
 
             if "roots" not in data:
                 logger.error("Invalid bookmarks file format: no roots")
                 return None
 
-            # Парсим корневую папку
-            root_data = data["roots"]["bookmark_bar"]
-            return self.parse_bookmark(root_data)
+            return data["roots"]["bookmark_bar"]
 
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing bookmarks file: {e}")
@@ -138,12 +228,15 @@ class BookmarksParser:
             if bookmark is None:
                 return []
 
-        urls = []
-        if bookmark.url:
-            urls.append(str(bookmark.url))
-
-        if bookmark.children:
-            for child in bookmark.children:
-                urls.extend(self.get_all_urls(child))
+        # Обход в глубину с явным стеком; дочерние элементы кладутся в обратном
+        # порядке, чтобы URL шли в порядке закладок
+        urls: List[str] = []
+        stack = deque([bookmark])
+        while stack:
+            current = stack.pop()
+            if current.url:
+                urls.append(str(current.url))
+            if current.children:
+                stack.extend(reversed(current.children))
 
         return urls
@@ -1,19 +1,47 @@
 """
 @file: processing_tracker.py
 @description: Модуль для отслеживания процесса обработки URL и сохранения результатов
-@dependencies: json, pathlib, threading
+@dependencies: json, orjson (необязательно), os, pathlib, threading
 @created: 2024-03-21
 """
 
 import json
+import os
 import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import IO, Any, Dict, List, Optional, Set
 import logging
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Количество записей в журнале изменений, после которого снимок перезаписывается
+LOG_COMPACT_INTERVAL = 1000
+# Как часто (в секундах) обновляется метка времени, общая для пакета изменений
+TIMESTAMP_REFRESH_INTERVAL = 0.1
+
+
+def _json_loads(data: str) -> Any:
+    """Разбирает JSON через orjson, если он установлен."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """Сериализует JSON через orjson, если он установлен. Без indent - компактно."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
 class ProcessingTracker:
     """Класс для отслеживания процесса обработки URL и сохранения результатов."""
     
@@ -24,11 +52,24 @@ class ProcessingTracker:
         Args:
             results_dir: Директория для сохранения результатов
         """
-        logger.info(f"[TRACKER] Инициализация ProcessingTracker: {results_dir}")
+        logger.info("[TRACKER] Инициализация ProcessingTracker: %s", results_dir)
         self.results_dir = results_dir
         self.processing_file = results_dir / "processing.json"
+        # Журнал изменений: одна JSON строка на изменение URL после последнего снимка
+        self.log_file = results_dir / "processing.jsonl"
+        # Блокировка писателей. Читатели работают без неё: записи URL не изменяются
+        # на месте, а заменяются новыми словарями, поэтому прочитанная запись
+        # всегда согласована, а копирование словаря URL атомарно под GIL
         self.lock = threading.RLock()
         self.data = None
+        # URL, обрабатываемые в данный момент (состояние не сохраняется на диск)
+        self._in_progress: Set[str] = set()
+        # Записи журнала, накопленные update_url и ещё не записанные на диск
+        self._pending_ops: List[str] = []
+        self._log: Optional[IO[str]] = None
+        self._log_ops = 0
+        self._now_iso = ""
+        self._now_checked = float("-inf")
         self._ensure_dirs()
         logger.info("[TRACKER] Инициализация ProcessingTracker завершена")
     
@@ -39,82 +80,199 @@ class ProcessingTracker:
             logger.info("[TRACKER] Создание нового файла состояния")
             self.data = {
                 "urls": {},
-                "last_update": datetime.now().isoformat()
+                "last_update": self._now()
             }
+            self._replay_log()
             self._save_data()
         else:
             logger.info("[TRACKER] Загрузка существующего файла состояния")
             self._load_data()
+            # Изменения из журнала переносим в новый снимок
+            if self._replay_log():
+                self._save_data()
     
     def _load_data(self) -> None:
         logger.info("[TRACKER] Загрузка данных из файла")
         try:
             with self.lock:
                 with open(self.processing_file, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-                    logger.info(f"[TRACKER] Загружено URL: {len(self.data['urls'])}")
+                    self.data = _json_loads(f.read())
+                    logger.info("[TRACKER] Загружено URL: %s", len(self.data['urls']))
         except Exception as e:
-            logger.error(f"[TRACKER] Ошибка загрузки данных: {e}")
+            logger.error("[TRACKER] Ошибка загрузки данных: %s", e)
             self.data = {
                 "urls": {},
-                "last_update": datetime.now().isoformat()
+                "last_update": self._now()
             }
     
+    def _now(self) -> str:
+        """
+        Возвращает текущее время в формате ISO. Значение пересчитывается не чаще
+        раза в TIMESTAMP_REFRESH_INTERVAL секунд и общее для изменений внутри интервала.
+        """
+        checked = time.monotonic()
+        if checked - self._now_checked >= TIMESTAMP_REFRESH_INTERVAL:
+            self._now_iso = datetime.now().isoformat()
+            self._now_checked = checked
+        return self._now_iso
+
+    def _replay_log(self) -> int:
+        """
+        Применяет к данным изменения из журнала.
+
+        Returns:
+            int: Количество применённых записей
+        """
+        if not self.data or not self.log_file.exists():
+            return 0
+        applied = 0
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    op = _json_loads(line)
+                except json.JSONDecodeError:
+                    # Последняя строка могла быть записана не полностью
+                    logger.warning("[TRACKER] Пропуск повреждённой записи журнала")
+                    continue
+                self.data["urls"].setdefault(op["url"], {}).update(op["fields"])
+                self.data["last_update"] = op["ts"]
+                applied += 1
+        logger.info("[TRACKER] Применено записей журнала: %s", applied)
+        return applied
+
     def _save_data(self) -> None:
-        logger.info("[TRACKER] Сохранение данных в файл")
+        """Записывает полный снимок данных и очищает журнал изменений."""
+        logger.debug("[TRACKER] Сохранение данных в файл")
         with self.lock:
             if self.data:
-                with open(self.processing_file, 'w', encoding='utf-8') as f:
-                    json.dump(self.data, f, indent=2, ensure_ascii=False)
-                    logger.info(f"[TRACKER] Сохранено URL: {len(self.data['urls'])}")
+                tmp_file = self.processing_file.with_suffix('.json.tmp')
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(_json_dumps(self.data))
+                os.replace(tmp_file, self.processing_file)
+                logger.debug("[TRACKER] Сохранено URL: %s", len(self.data['urls']))
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+                self.log_file.unlink(missing_ok=True)
+                self._log_ops = 0
+                self._pending_ops.clear()
+
+    def _set_fields(self, url: str, fields: Dict[str, Any], buffered: bool = False) -> None:
+        """
+        Обновляет поля URL и добавляет изменение в журнал.
+
+        Args:
+            url: URL для обновления
+            fields: Новые значения полей
+            buffered: Отложить запись до вызова flush()
+        """
+        now = self._now()
+        url_info = dict(self.data["urls"].get(url, {}))
+        url_info.update(fields)
+        self.data["urls"][url] = url_info
+        self.data["last_update"] = now
+        line = _json_dumps({"url": url, "fields": fields, "ts": now}) + "\n"
+        if buffered:
+            self._pending_ops.append(line)
+        else:
+            self._write_log([line])
+
+    def _write_log(self, lines: List[str]) -> None:
+        """Дописывает строки в журнал и при необходимости перезаписывает снимок."""
+        if self._log is None:
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+        self._log.write(''.join(lines))
+        self._log.flush()
+        self._log_ops += len(lines)
+        if self._log_ops >= LOG_COMPACT_INTERVAL:
+            self._save_data()
+
+    def flush(self) -> None:
+        """Записывает на диск изменения, накопленные update_url."""
+        with self.lock:
+            if self._pending_ops:
+                lines = self._pending_ops
+                self._pending_ops = []
+                self._write_log(lines)
+
+    def export(self, path: Path, pretty: bool = True) -> None:
+        """
+        Сохраняет текущее состояние в отдельный файл.
+
+        Args:
+            path: Путь к файлу
+            pretty: Записать JSON с отступами
+        """
+        with self.lock:
+            self.flush()
+            text = _json_dumps(self.data, indent=pretty)
+        Path(path).write_text(text, encoding='utf-8')
+
+    def close(self) -> None:
+        """Записывает накопленные изменения в снимок и закрывает журнал."""
+        with self.lock:
+            self.flush()
+            if self._log_ops or self.log_file.exists():
+                self._save_data()
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def clear(self) -> None:
+        """Удаляет все URL и записывает пустой снимок, журнал очищается."""
+        with self.lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            self._in_progress.clear()
+            self.data = {
+                "urls": {},
+                "last_update": self._now()
+            }
+            self.results_dir.mkdir(parents=True, exist_ok=True)
+            self._save_data()
     
     def add_url(self, url: str, title: str) -> None:
-        logger.info(f"[TRACKER] Добавление URL: {url}, title: {title}")
+        logger.debug("[TRACKER] Добавление URL: %s, title: %s", url, title)
         with self.lock:
             if self.data and url not in self.data["urls"]:
-                logger.info(f"[TRACKER] Новый URL: {url}")
-                self.data["urls"][url] = {
+                logger.debug("[TRACKER] Новый URL: %s", url)
+                self._set_fields(url, {
                     "title": title,
                     "status": "pending",
                     "check_result": None,
                     "check_time": None,
                     "markdown_path": None,
                     "error": None
-                }
-                self.data["last_update"] = datetime.now().isoformat()
-                self._save_data()
+                })
             else:
-                logger.info(f"[TRACKER] URL уже существует: {url}")
+                logger.debug("[TRACKER] URL уже существует: %s", url)
     
     def update_check_result(self, url: str, success: bool, error: Optional[str] = None) -> None:
-        logger.info(f"[TRACKER] Обновление результата проверки: {url}, success: {success}, error: {error}")
+        logger.debug("[TRACKER] Обновление результата проверки: %s, success: %s, error: %s", url, success, error)
         with self.lock:
             if self.data and url in self.data["urls"]:
-                self.data["urls"][url].update({
+                self._set_fields(url, {
                     "status": "checked",
                     "check_result": success,
-                    "check_time": datetime.now().isoformat(),
+                    "check_time": self._now(),
                     "error": error
                 })
-                self.data["last_update"] = datetime.now().isoformat()
-                self._save_data()
-                logger.info(f"[TRACKER] Результат проверки обновлен: {url}")
+                logger.debug("[TRACKER] Результат проверки обновлен: %s", url)
             else:
-                logger.warning(f"[TRACKER] URL не найден при обновлении результата: {url}")
+                logger.warning("[TRACKER] URL не найден при обновлении результата: %s", url)
     
     def update_markdown_path(self, url: str, markdown_path: Optional[Path]) -> None:
-        logger.info(f"[TRACKER] Обновление пути markdown: {url}, path: {markdown_path}")
+        logger.debug("[TRACKER] Обновление пути markdown: %s, path: %s", url, markdown_path)
         with self.lock:
             if self.data and url in self.data["urls"]:
-                self.data["urls"][url].update({
+                self._set_fields(url, {
                     "status": "completed" if markdown_path else "failed",
                     "markdown_path": str(markdown_path) if markdown_path else None
                 })
-                self.data["last_update"] = datetime.now().isoformat()
-                self._save_data()
-                logger.info(f"[TRACKER] Путь markdown обновлен: {url}")
+                logger.debug("[TRACKER] Путь markdown обновлен: %s", url)
             else:
-                logger.warning(f"[TRACKER] URL не найден при обновлении пути: {url}")
+                logger.warning("[TRACKER] URL не найден при обновлении пути: %s", url)
     
     def get_pending_urls(self) -> List[str]:
         """
@@ -123,41 +281,38 @@ class ProcessingTracker:
         Returns:
             List[str]: Список URL
         """
-        logger.info("[TRACKER] Получение списка ожидающих обработки URL")
+        logger.debug("[TRACKER] Получение списка ожидающих обработки URL")
         
-        with self.lock:
-            if not self.data:
-                return []
-            pending = [
-                url for url, info in self.data["urls"].items()
-                if info["status"] in ["pending", "checked"] 
-                and info.get("check_result", True)  # Включаем только успешно проверенные или не проверенные
-                and not info.get("markdown_path")
-            ]
-            
-        logger.info(f"[TRACKER] Найдено ожидающих URL: {len(pending)}")
+        if not self.data:
+            return []
+        pending = [
+            url for url, info in list(self.data["urls"].items())
+            if info["status"] in ["pending", "checked"] 
+            and info.get("check_result", True)  # Включаем только успешно проверенные или не проверенные
+            and not info.get("markdown_path")
+        ]
+
+        logger.info("[TRACKER] Найдено ожидающих URL: %s", len(pending))
         return pending
     
     def get_url_info(self, url: str) -> Optional[Dict]:
-        logger.info(f"[TRACKER] Получение информации об URL: {url}")
-        with self.lock:
-            if not self.data:
-                return None
-            info = self.data["urls"].get(url)
-            if info:
-                logger.info(f"[TRACKER] Информация найдена: {url}, status: {info['status']}")
-            else:
-                logger.warning(f"[TRACKER] Информация не найдена: {url}")
-            return info
+        logger.debug("[TRACKER] Получение информации об URL: %s", url)
+        if not self.data:
+            return None
+        info = self.data["urls"].get(url)
+        if info:
+            logger.debug("[TRACKER] Информация найдена: %s, status: %s", url, info['status'])
+        else:
+            logger.debug("[TRACKER] Информация не найдена: %s", url)
+        return info
     
     def get_all_urls(self) -> Dict:
-        logger.info("[TRACKER] Получение всех URL")
-        with self.lock:
-            if not self.data:
-                return {}
-            urls = dict(self.data["urls"])
-            logger.info(f"[TRACKER] Всего URL: {len(urls)}")
-            return urls
+        logger.debug("[TRACKER] Получение всех URL")
+        if not self.data:
+            return {}
+        urls = dict(self.data["urls"])
+        logger.debug("[TRACKER] Всего URL: %s", len(urls))
+        return urls
     
     def reset_failed(self) -> None:
         logger.info("[TRACKER] Сброс неудачных проверок")
@@ -165,18 +320,22 @@ class ProcessingTracker:
             if not self.data:
                 return
             reset_count = 0
-            for url_info in self.data["urls"].values():
+            urls = self.data["urls"]
+            for url, url_info in list(urls.items()):
                 if url_info["status"] == "failed":
-                    url_info["status"] = "pending"
-                    url_info["check_result"] = None
-                    url_info["check_time"] = None
-                    url_info["markdown_path"] = None
-                    url_info["error"] = None
+                    urls[url] = {
+                        **url_info,
+                        "status": "pending",
+                        "check_result": None,
+                        "check_time": None,
+                        "markdown_path": None,
+                        "error": None,
+                    }
                     reset_count += 1
             if reset_count > 0:
-                self.data["last_update"] = datetime.now().isoformat()
+                self.data["last_update"] = self._now()
                 self._save_data()
-            logger.info(f"[TRACKER] Сброшено URL: {reset_count}")
+            logger.info("[TRACKER] Сброшено URL: %s", reset_count)
 
     def update_url_status(self, url: str, status: str, error: Optional[str] = None) -> None:
         """
@@ -187,15 +346,64 @@ class ProcessingTracker:
             status: Новый статус
             error: Сообщение об ошибке
         """
-        logger.info(f"[TRACKER] Обновление статуса URL: {url}, status: {status}")
+        logger.debug("[TRACKER] Обновление статуса URL: %s, status: %s", url, status)
 
         with self.lock:
             if self.data and url in self.data["urls"]:
-                self.data["urls"][url]["status"] = status
-                self.data["urls"][url]["error"] = error
+                fields: Dict[str, Any] = {"status": status, "error": error}
                 if status == "completed":
-                    self.data["urls"][url]["check_time"] = datetime.now().isoformat()
-                self.data["last_update"] = datetime.now().isoformat()
-                self._save_data()
+                    fields["check_time"] = self._now()
+                self._set_fields(url, fields)
+            else:
+                logger.warning("[TRACKER] URL не найден: %s", url)
+
+    def mark_processing(self, url: str) -> None:
+        """
+        Отмечает URL как обрабатываемый. Состояние хранится только в памяти.
+
+        Args:
+            url: URL, обработка которого начата
+        """
+        with self.lock:
+            self._in_progress.add(url)
+
+    def is_processing(self, url: str) -> bool:
+        """
+        Проверяет, обрабатывается ли URL в данный момент.
+
+        Args:
+            url: URL для проверки
+
+        Returns:
+            bool: True если обработка URL начата и ещё не завершена
+        """
+        return url in self._in_progress
+
+    def update_url(
+        self, url: str, status: str, markdown_path: Optional[Path] = None, error: Optional[str] = None
+    ) -> None:
+        """
+        Обновляет статус URL и путь к markdown файлу одной операцией.
+        Изменения записываются на диск при вызове flush().
+
+        Args:
+            url: URL для обновления
+            status: Новый статус
+            markdown_path: Путь к markdown файлу
+            error: Сообщение об ошибке
+        """
+        logger.debug("[TRACKER] Обновление URL: %s, status: %s, path: %s", url, status, markdown_path)
+
+        with self.lock:
+            self._in_progress.discard(url)
+            if self.data and url in self.data["urls"]:
+                fields: Dict[str, Any] = {
+                    "status": status,
+                    "error": error,
+                    "markdown_path": str(markdown_path) if markdown_path else None
+                }
+                if status == "completed":
+                    fields["check_time"] = self._now()
+                self._set_fields(url, fields, buffered=True)
             else:
-                logger.warning(f"[TRACKER] URL не найден: {url}")
+                logger.warning("[TRACKER] URL не найден: %s", url)
@@ -5,11 +5,54 @@
 Модуль окна настроек LLM.
 """
 
-from PyQt5.QtCore import Qt
+from typing import Optional
+
+from PyQt5.QtCore import (QModelIndex, QPersistentModelIndex, Qt,
+                          QStringListModel, pyqtSignal)
 from PyQt5.QtWidgets import (QDialog, QFormLayout, QLineEdit, 
                            QPushButton, QVBoxLayout, QComboBox,
-                           QHBoxLayout, QListWidget, QSpinBox,
-                           QMessageBox, QInputDialog)
+                           QHBoxLayout, QListView, QSpinBox,
+                           QMessageBox, QAbstractItemView)
+
+
+class _ModelNamesModel(QStringListModel):
+    """Список имен моделей, не допускающий пустых и повторяющихся имен."""
+
+    name_rejected = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Множество имен для проверки дубликатов без обхода списка
+        self._names = set()
+
+    def setStringList(self, names):
+        self._names = set(names)
+        super().setStringList(names)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole:
+            return super().setData(index, value, role)
+
+        name = value.strip()
+        old_name = index.data()
+        if name == old_name:
+            return False
+        if not name or name in self._names:
+            self.name_rejected.emit(name)
+            return False
+        if not super().setData(index, name, role):
+            return False
+        self._names.discard(old_name)
+        self._names.add(name)
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        names = self.stringList()[row:row + count]
+        if not super().removeRows(row, count, parent):
+            return False
+        self._names.difference_update(names)
+        return True
+
 
 class LLMSettingsDialog(QDialog):
     """Диалог настроек LLM."""
@@ -24,19 +67,34 @@ class LLMSettingsDialog(QDialog):
         """
         super().__init__(parent)
         self.settings = settings
+        # Строка, добавленная кнопкой "Добавить", пока для нее не введено имя
+        self._new_row: Optional[QPersistentModelIndex] = None
         self.setWindowTitle("Настройки LLM")
         self.setModal(True)
         self._init_ui()
+        self.reload(settings)
         
     def _init_ui(self):
         """Инициализация интерфейса."""
         layout = QVBoxLayout(self)
         form_layout = QFormLayout()
         
-        # Список моделей
+        # Список моделей; список и комбобокс показывают одну модель данных
         models_layout = QHBoxLayout()
-        self.models_list = QListWidget()
-        self.models_list.addItems(self.settings.get("available_models", []))
+        self._models = _ModelNamesModel(self)
+        self.models_list = QListView()
+        self.models_list.setModel(self._models)
+        # Имена моделей редактируются прямо в списке
+        self.models_list.setEditTriggers(
+            QAbstractItemView.DoubleClicked
+            | QAbstractItemView.SelectedClicked
+            | QAbstractItemView.EditKeyPressed
+        )
+        self._models.name_rejected.connect(self._on_name_rejected)
+        self.models_list.itemDelegate().closeEditor.connect(self._on_editor_closed)
+        # При переходе на другую строку представление само закрывает редактор,
+        # не отправляя closeEditor
+        self.models_list.selectionModel().currentChanged.connect(self._on_current_changed)
         
         # Кнопки управления моделями
         models_buttons = QVBoxLayout()
@@ -60,27 +118,22 @@ class LLMSettingsDialog(QDialog):
         
         # Выбранная модель
         self.model_combo = QComboBox()
-        self.model_combo.addItems(self.settings.get("available_models", []))
-        current_model = self.settings.get("model", "gpt-3.5-turbo")
-        self.model_combo.setCurrentText(current_model)
+        self.model_combo.setModel(self._models)
         form_layout.addRow("Текущая модель:", self.model_combo)
         
         # API ключ
         self.api_key = QLineEdit()
-        self.api_key.setText(self.settings.get("api_key", ""))
         self.api_key.setEchoMode(QLineEdit.Password)
         form_layout.addRow("API ключ:", self.api_key)
         
         # Базовый URL
         self.base_url = QLineEdit()
-        self.base_url.setText(self.settings.get("base_url", "https://api.openai.com/v1"))
         form_layout.addRow("Базовый URL:", self.base_url)
         
         # Задержка между запросами
         self.request_delay = QSpinBox()
         self.request_delay.setRange(0, 10000)
         self.request_delay.setSingleStep(100)
-        self.request_delay.setValue(self.settings.get("llm_request_delay", 1000))
         self.request_delay.setSuffix(" мс")
         form_layout.addRow("Задержка между запросами:", self.request_delay)
         
@@ -97,56 +150,75 @@ class LLMSettingsDialog(QDialog):
         buttons_layout.addWidget(cancel_btn)
         layout.addLayout(buttons_layout)
     
+    def reload(self, settings: dict):
+        """
+        Заполнение виджетов значениями настроек без пересоздания диалога.
+        
+        Args:
+            settings: Словарь с текущими настройками
+        """
+        self.settings = settings
+        self._new_row = None
+        self._models.setStringList(settings.get("available_models", []))
+        self.model_combo.setCurrentText(settings.get("model", "gpt-3.5-turbo"))
+        
+        self.api_key.setText(settings.get("api_key", ""))
+        self.base_url.setText(settings.get("base_url", "https://api.openai.com/v1"))
+        self.request_delay.setValue(settings.get("llm_request_delay", 1000))
+    
     def _add_model(self):
         """Добавление новой модели."""
-        model_name, ok = QInputDialog.getText(self, 'Добавить модель', 
-                                            'Введите название модели:')
-        if ok and model_name:
-            if model_name not in [self.models_list.item(i).text() 
-                                for i in range(self.models_list.count())]:
-                self.models_list.addItem(model_name)
-                self.model_combo.addItem(model_name)
-            else:
-                QMessageBox.warning(self, "Ошибка", 
-                                  "Такая модель уже существует!")
+        # Пустая строка удаляется, если имя не будет введено
+        self._drop_empty_new_row()
+        row = self._models.rowCount()
+        self._models.insertRows(row, 1)
+        index = self._models.index(row)
+        self._new_row = QPersistentModelIndex(index)
+        self.models_list.setCurrentIndex(index)
+        self.models_list.edit(index)
     
     def _edit_model(self):
         """Редактирование выбранной модели."""
-        current_item = self.models_list.currentItem()
-        if not current_item:
+        current = self.models_list.currentIndex()
+        if not current.isValid():
             QMessageBox.warning(self, "Ошибка", 
                               "Выберите модель для редактирования!")
             return
             
-        old_name = current_item.text()
-        new_name, ok = QInputDialog.getText(self, 'Изменить модель', 
-                                          'Введите новое название модели:', 
-                                          text=old_name)
-        
-        if ok and new_name and new_name != old_name:
-            if new_name not in [self.models_list.item(i).text() 
-                              for i in range(self.models_list.count())]:
-                current_item.setText(new_name)
-                # Обновляем комбобокс
-                idx = self.model_combo.findText(old_name)
-                if idx >= 0:
-                    self.model_combo.setItemText(idx, new_name)
-                    if self.model_combo.currentText() == old_name:
-                        self.model_combo.setCurrentText(new_name)
-            else:
-                QMessageBox.warning(self, "Ошибка", 
-                                  "Такая модель уже существует!")
+        # Комбобокс обновляется вместе с моделью после ввода имени
+        self.models_list.edit(current)
+    
+    def _on_name_rejected(self, name: str):
+        """Сообщение об отклоненном имени модели."""
+        if name:
+            QMessageBox.warning(self, "Ошибка", 
+                              "Такая модель уже существует!")
+    
+    def _on_editor_closed(self, editor, hint):
+        """Удаление добавленной строки, для которой не введено имя."""
+        self._drop_empty_new_row()
+
+    def _on_current_changed(self, current, previous):
+        """Удаление добавленной строки без имени при переходе на другую строку."""
+        if self._new_row is not None and current.row() != self._new_row.row():
+            self._drop_empty_new_row()
+
+    def _drop_empty_new_row(self):
+        """Удаляет добавленную строку, если имя для нее не введено."""
+        new_row, self._new_row = self._new_row, None
+        if new_row is not None and new_row.isValid() and not new_row.data():
+            self._models.removeRows(new_row.row(), 1)
     
     def _delete_model(self):
         """Удаление выбранной модели."""
-        current_item = self.models_list.currentItem()
-        if not current_item:
+        current = self.models_list.currentIndex()
+        if not current.isValid():
             QMessageBox.warning(self, "Ошибка", 
                               "Выберите модель для удаления!")
             return
             
-        model_name = current_item.text()
-        if self.models_list.count() <= 1:
+        model_name = current.data()
+        if self._models.rowCount() <= 1:
             QMessageBox.warning(self, "Ошибка", 
                               "Нельзя удалить последнюю модель!")
             return
@@ -157,12 +229,7 @@ class LLMSettingsDialog(QDialog):
                                    QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            row = self.models_list.row(current_item)
-            self.models_list.takeItem(row)
-            # Удаляем из комбобокса
-            idx = self.model_combo.findText(model_name)
-            if idx >= 0:
-                self.model_combo.removeItem(idx)
+            self._models.removeRows(current.row(), 1)
     
     def get_settings(self) -> dict:
         """
@@ -176,6 +243,6 @@ class LLMSettingsDialog(QDialog):
             "api_key": self.api_key.text(),
             "base_url": self.base_url.text(),
             "llm_request_delay": self.request_delay.value(),
-            "available_models": [self.models_list.item(i).text() 
-                               for i in range(self.models_list.count())]
+            # Пустые имена (незавершенное добавление) не сохраняются
+            "available_models": [name for name in self._models.stringList() if name]
         } 
\ No newline at end of file
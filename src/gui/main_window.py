@@ -6,93 +6,235 @@
 """
 
 import asyncio
-import webbrowser
+import concurrent.futures
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QSettings, QTimer, pyqtSignal
 from PyQt5.QtWidgets import (QComboBox, QFileDialog, QFormLayout, QGroupBox,
-                           QHBoxLayout, QLabel, QMainWindow, QPushButton,
-                           QSpinBox, QTextEdit, QVBoxLayout, QWidget,
+                           QHBoxLayout, QLabel, QLineEdit, QMainWindow, QPushButton,
+                           QSpinBox, QPlainTextEdit, QVBoxLayout, QWidget,
                             QAction, QProgressBar)
 
-from core.checker import URLChecker
 from core.parser import BookmarksParser
-from core.content_processor import ContentProcessor
 from utils.config import Config
 from utils.logger import setup_logger
 from utils.settings import Settings
-from gui.llm_settings import LLMSettingsDialog
 
-class CheckerThread(QThread):
-    """Поток для проверки URL"""
+# Модули проверки (aiohttp), обработки контента (requests, lxml) и диалога
+# настроек LLM импортируются при первом использовании, чтобы ускорить запуск
+if TYPE_CHECKING:
+    from core.checker import URLChecker
+    from core.content_processor import ContentProcessor
+    from gui.llm_settings import LLMSettingsDialog
+
+# Схемы URL, которые проверяются по сети; остальные (chrome://, file://,
+# javascript: и т.п.) пропускаются без запроса. Схема URL регистронезависима,
+# поэтому префикс сравнивается в нижнем регистре
+_CHECKED_URL_PREFIXES = ("http://", "https://")
+
+
+class CheckerSession:
+    """
+    Фоновый поток с постоянным циклом событий и URLChecker, общие для всех
+    запусков проверки: поток, пул соединений, TLS сессии и DNS кэш
+    сохраняются между запусками. Проверяющий пересоздается только при
+    изменении его параметров.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._checker: Optional["URLChecker"] = None
+        self._checker_key: Optional[tuple] = None
+        self._thread = threading.Thread(target=self._run_loop, name="checker-loop", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        """Работа цикла событий в фоновом потоке"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> "concurrent.futures.Future":
+        """
+        Запускает корутину в цикле событий сессии (вызывается из потока GUI).
+
+        Args:
+            coro: Корутина
+
+        Returns:
+            concurrent.futures.Future: Результат выполнения корутины
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def get_checker(self, config: Config) -> "URLChecker":
+        """
+        Возвращает проверяющего для параметров из config (вызывается в self.loop).
+
+        Args:
+            config: Конфигурация проверки
+
+        Returns:
+            URLChecker: Открытый проверяющий со сброшенным состоянием
+        """
+        key = (config.timeout, config.retries, config.max_redirects, config.threads)
+        if self._checker is not None and key == self._checker_key:
+            self._checker.reset()
+            return self._checker
+
+        from core.checker import URLChecker
+
+        await self._close_checker()
+        checker = URLChecker(
+            timeout=config.timeout,
+            max_retries=config.retries,
+            max_redirects_count=config.max_redirects,
+            max_concurrency=config.threads,
+        )
+        await checker.__aenter__()
+        self._checker, self._checker_key = checker, key
+        return checker
+
+    async def _close_checker(self) -> None:
+        """Закрытие текущего проверяющего"""
+        if self._checker is not None:
+            checker, self._checker, self._checker_key = self._checker, None, None
+            await checker.__aexit__(None, None, None)
+
+    def close(self) -> None:
+        """Закрытие проверяющего, остановка цикла событий и потока"""
+        if self.loop.is_closed():
+            return
+        try:
+            self.submit(self._close_checker()).result()
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
+
+
+class CheckerTask(QObject):
+    """Запуск проверки URL в цикле событий CheckerSession"""
 
     progress = pyqtSignal(str)
-    url_checked = pyqtSignal(str, bool, str)  # url, success, error
     finished = pyqtSignal()
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, session: CheckerSession):
         super().__init__()
         self.config = config
+        self.session = session
         self._is_running = True
+        # Результаты (url, success, error) забирает таймер GUI, сигналы на
+        # каждый URL не отправляются; append/popleft у deque потокобезопасны
+        self.results = deque()
+        self.processed = 0
+        self.total_urls = 0
+        self._future: Optional[concurrent.futures.Future] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Запуск проверки"""
+        self._future = self.session.submit(self._run())
+        # finished отправляется из потока цикла событий и доставляется в GUI
+        # через очередь событий Qt
+        self._future.add_done_callback(lambda future: self.finished.emit())
+
+    def isRunning(self) -> bool:
+        """Выполняется ли проверка"""
+        return self._future is not None and not self._future.done()
 
     def stop(self):
         """Остановка проверки"""
         self._is_running = False
+        # Выполняющиеся запросы отменяются в цикле событий сессии
+        if self.isRunning():
+            self.session.loop.call_soon_threadsafe(self._cancel_task)
+
+    def wait(self):
+        """Ожидание завершения проверки"""
+        if self._future is not None:
+            concurrent.futures.wait([self._future])
+
+    def drain_results(self) -> list:
+        """
+        Забирает накопленные результаты проверки (вызывается из потока GUI).
+
+        Returns:
+            list: Результаты (url, success, error) в порядке завершения
+        """
+        results = self.results
+        drained = []
+        while results:
+            drained.append(results.popleft())
+        return drained
+
+    def _cancel_task(self):
+        """Отмена задачи проверки (вызывается в цикле событий сессии)"""
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        """Выполнение проверки; отмена при остановке не считается ошибкой"""
+        self._task = asyncio.current_task()
+        try:
+            await self.check_urls()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._task = None
 
     async def check_urls(self):
         """Асинхронная проверка URL"""
         parser = BookmarksParser(self.config.bookmarks_file)
-        root_bookmark = parser.parse()
-
-        if not root_bookmark:
+        # Для проверки нужны только URL: объекты Bookmark и список URL
+        # не строятся, воркеры получают URL по мере обхода закладок.
+        # Чтение и подсчет выполняются вне цикла событий, чтобы остановка
+        # проверки срабатывала и во время разбора большого файла
+        # Повторяющиеся URL (например, синхронизированные с разных устройств)
+        # проверяются один раз
+        self.total_urls = await asyncio.to_thread(parser.count_urls, True)
+
+        if not self.total_urls:
             self.progress.emit("Ошибка при парсинге файла закладок")
             return
 
-        urls = parser.get_all_urls(root_bookmark)
-        total_urls = len(urls)
-        processed = 0
+        checker = await self.session.get_checker(self.config)
+        # Воркеры берут URL из общего итератора, поэтому одновременно
+        # проверяется не более config.threads URL
+        pending = parser.iter_urls_fast(unique=True)
 
-        async with URLChecker(
-            timeout=self.config.timeout, max_retries=self.config.retries, max_redirects_count=self.config.max_redirects
-        ) as checker:
-            for url in urls:
+        async def worker():
+            for url in pending:
                 if not self._is_running:
-                    break
-
+                    return
+                if not url[:len("https://")].lower().startswith(_CHECKED_URL_PREFIXES):
+                    # success=None - URL пропущен
+                    self.results.append((url, None, None))
+                    self.processed += 1
+                    continue
                 try:
                     result = await checker.check_url(url)
-                    status = "доступен" if result.is_available else "недоступен"
                     error = None if result.is_available else result.error
-                    
-                    # Отправляем результат проверки
-                    self.url_checked.emit(url, result.is_available, error)
-                    
-                    # Обновляем прогресс
-                    processed += 1
-                    progress = f"Проверено {processed} из {total_urls} URL ({int(processed/total_urls*100)}%)"
-                    self.progress.emit(progress)
-                    
+                    self.results.append((url, result.is_available, error))
                 except Exception as e:
-                    error_msg = str(e)
-                    self.progress.emit(f"Ошибка при проверке {url}: {error_msg}")
-                    self.url_checked.emit(url, False, error_msg)
-                    processed += 1
+                    self.results.append((url, False, f"Ошибка при проверке: {e}"))
+                self.processed += 1
 
-    def run(self):
-        """Запуск проверки"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self.check_urls())
-        finally:
-            loop.close()
-        self.finished.emit()
+        await asyncio.gather(
+            *(worker() for _ in range(min(self.config.threads, self.total_urls)))
+        )
 
 
 class MainWindow(QMainWindow):
     """Главное окно приложения."""
 
+    # Максимальное количество строк лога, старые строки удаляются
+    LOG_MAX_LINES = 5000
+
+    # Период (мс), с которым лог забирает результаты задачи проверки
+    RESULTS_POLL_INTERVAL = 100
+
     def __init__(self) -> None:
         """Инициализация главного окна."""
         super().__init__()
@@ -100,9 +242,19 @@ class MainWindow(QMainWindow):
         # Инициализация компонентов
         self.config = Config()
         self.logger = setup_logger()
-        self.checker_thread: Optional[CheckerThread] = None
+        self.checker_task: Optional[CheckerTask] = None
         self.settings = Settings()
-        self.content_processor: Optional[ContentProcessor] = None
+        # Геометрия окна хранится в нативном хранилище Qt
+        self.qsettings = QSettings("kansoftware", "bookmarks_checker")
+        self.content_processor: Optional["ContentProcessor"] = None
+        self._llm_dialog: Optional["LLMSettingsDialog"] = None
+        # Соединения проверки переиспользуются между запусками
+        self._checker_session = CheckerSession()
+        
+        # Таймер выборки результатов проверки
+        self._results_timer = QTimer(self)
+        self._results_timer.setInterval(self.RESULTS_POLL_INTERVAL)
+        self._results_timer.timeout.connect(self._drain_results)
         
         self.setWindowTitle("Bookmarks Checker")
         self.setMinimumSize(800, 600)
@@ -114,8 +266,10 @@ class MainWindow(QMainWindow):
         self._init_ui()
         self._connect_signals()
         
-        # Загрузка настроек (после создания всех виджетов)
-        self._load_settings()
+        # Геометрия восстанавливается до показа окна, остальные настройки
+        # применяются на первой итерации цикла событий, после первой отрисовки
+        self._restore_geometry()
+        QTimer.singleShot(0, self._load_settings)
 
     def _create_menu(self) -> None:
         """Создание главного меню."""
@@ -143,9 +297,15 @@ class MainWindow(QMainWindow):
         
         # Действие "Об авторе"
         about_action = QAction('Об авторе', self)
-        about_action.triggered.connect(lambda: webbrowser.open('https://kansoftware.ru'))
+        about_action.triggered.connect(self._open_about)
         help_menu.addAction(about_action)
 
+    def _open_about(self) -> None:
+        """Открытие сайта автора."""
+        import webbrowser
+
+        webbrowser.open('https://kansoftware.ru')
+
     def _init_ui(self) -> None:
         """Инициализация пользовательского интерфейса."""
         # Создаем центральный виджет
@@ -193,8 +353,11 @@ class MainWindow(QMainWindow):
 
         # Путь к файлу закладок
         bookmarks_layout = QHBoxLayout()
-        self.bookmarks_path = QLabel("Не выбран")
-        self.bookmarks_path.setStyleSheet("border: 1px solid gray; padding: 2px;")
+        # Поле только для чтения не меняет размер при смене пути,
+        # поэтому форма не перестраивается
+        self.bookmarks_path = QLineEdit()
+        self.bookmarks_path.setReadOnly(True)
+        self.bookmarks_path.setPlaceholderText("Не выбран")
         bookmarks_btn = QPushButton("Выбрать")
         bookmarks_btn.clicked.connect(self.select_bookmarks_file)
         bookmarks_layout.addWidget(self.bookmarks_path)
@@ -210,8 +373,9 @@ class MainWindow(QMainWindow):
 
         # Путь для сохранения результатов
         results_layout = QHBoxLayout()
-        self.results_path = QLabel("Не выбран")
-        self.results_path.setStyleSheet("border: 1px solid gray; padding: 2px;")
+        self.results_path = QLineEdit()
+        self.results_path.setReadOnly(True)
+        self.results_path.setPlaceholderText("Не выбран")
         results_btn = QPushButton("Выбрать")
         results_btn.clicked.connect(self.select_results_dir)
         results_layout.addWidget(self.results_path)
@@ -239,8 +403,9 @@ class MainWindow(QMainWindow):
         layout.addLayout(progress_layout)
 
         # Лог
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(self.LOG_MAX_LINES)
         layout.addWidget(QLabel("Лог:"))
         layout.addWidget(self.log_text)
 
@@ -249,14 +414,24 @@ class MainWindow(QMainWindow):
         self.start_btn.clicked.connect(self._start_checking)
         self.stop_btn.clicked.connect(self._stop_checking)
 
+    def _restore_geometry(self) -> None:
+        """Восстановление геометрии окна."""
+        # Размер и позиция из файла настроек используются, пока геометрия
+        # не сохранена в QSettings
+        geometry = self.qsettings.value("geometry")
+        if geometry:
+            self.restoreGeometry(geometry)
+            window_state = self.qsettings.value("windowState")
+            if window_state:
+                self.restoreState(window_state)
+        else:
+            window_settings = self.settings.get_window_settings()
+            if window_settings:
+                self.resize(*window_settings["size"])
+                self.move(*window_settings["position"])
+
     def _load_settings(self) -> None:
         """Загрузка настроек."""
-        # Загрузка настроек окна
-        window_settings = self.settings.get_window_settings()
-        if window_settings:
-            self.resize(*window_settings["size"])
-            self.move(*window_settings["position"])
-        
         # Загрузка настроек проверки
         checker_settings = self.settings.get_checker_settings()
         if checker_settings:
@@ -273,11 +448,8 @@ class MainWindow(QMainWindow):
     def _save_settings(self) -> None:
         """Сохранение настроек."""
         # Сохранение настроек окна
-        window_settings = {
-            "size": [self.width(), self.height()],
-            "position": [self.x(), self.y()]
-        }
-        self.settings.update_window_settings(window_settings)
+        self.qsettings.setValue("geometry", self.saveGeometry())
+        self.qsettings.setValue("windowState", self.saveState())
         
         # Сохранение настроек проверки
         checker_settings = {
@@ -291,9 +463,16 @@ class MainWindow(QMainWindow):
 
     def _show_llm_settings(self) -> None:
         """Показ диалога настроек LLM."""
-        dialog = LLMSettingsDialog(self.settings.get_llm_settings(), self)
-        if dialog.exec_():
-            self.settings.update_llm_settings(dialog.get_settings())
+        # Диалог создается один раз, при повторных открытиях обновляются только значения
+        if self._llm_dialog is None:
+            # Модуль диалога импортируется только при первом открытии
+            from gui.llm_settings import LLMSettingsDialog
+
+            self._llm_dialog = LLMSettingsDialog(self.settings.get_llm_settings(), self)
+        else:
+            self._llm_dialog.reload(self.settings.get_llm_settings())
+        if self._llm_dialog.exec_():
+            self.settings.update_llm_settings(self._llm_dialog.get_settings())
 
     def select_bookmarks_file(self) -> None:
         """Выбор файла закладок."""
@@ -333,26 +512,29 @@ class MainWindow(QMainWindow):
         self.config.browser = self.browser_combo.currentText()
 
         # Создаем процессор контента
+        from core.content_processor import ContentProcessor
+
         self.content_processor = ContentProcessor(
             Path(self.config.results_dir),
             max_workers=self.config.threads
         )
 
-        # Создаем и запускаем поток проверки
-        self.checker_thread = CheckerThread(self.config)
-        self.checker_thread.progress.connect(self._update_log)
-        self.checker_thread.url_checked.connect(self._update_url_checked)
-        self.checker_thread.finished.connect(self._checking_finished)
+        # Создаем задачу проверки
+        self.checker_task = CheckerTask(self.config, self._checker_session)
+        self.checker_task.progress.connect(self._update_log)
+        self.checker_task.finished.connect(self._checking_finished)
 
         # Отключаем кнопки
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
 
-        # Очищаем лог
+        # Очищаем лог и прогресс
         self.log_text.clear()
+        self.progress_bar.reset()
 
         # Запускаем проверку
-        self.checker_thread.start()
+        self.checker_task.start()
+        self._results_timer.start()
 
         # Запускаем обработку контента
         self.content_processor.start_processing()
@@ -361,9 +543,11 @@ class MainWindow(QMainWindow):
 
     def _stop_checking(self) -> None:
         """Остановка проверки."""
-        if self.checker_thread and self.checker_thread.isRunning():
-            self.checker_thread.stop()
-            self.checker_thread.wait()
+        if self.checker_task and self.checker_task.isRunning():
+            self.checker_task.stop()
+            self.checker_task.wait()
+        self._results_timer.stop()
+        self._drain_results()
 
         if self.content_processor:
             self.content_processor.stop_processing()
@@ -374,17 +558,39 @@ class MainWindow(QMainWindow):
 
     def _update_log(self, message: str) -> None:
         """Обновление лога"""
-        self.log_text.append(message)
+        self.log_text.appendPlainText(message)
 
-    def _update_url_checked(self, url: str, success: bool, error: str) -> None:
-        """Обновление результата проверки URL"""
-        status = "доступен" if success else "недоступен"
-        self.log_text.append(f"URL {url}: {status}")
-        if not success:
-            self.log_text.append(f"Ошибка: {error}")
+    def _drain_results(self) -> None:
+        """Перенос накопленных результатов проверки в лог и прогресс-бар"""
+        task = self.checker_task
+        if task is None:
+            return
+
+        lines = []
+        for url, success, error in task.drain_results():
+            if success is None:
+                lines.append(f"URL {url}: пропущен (не HTTP)")
+                continue
+            status = "доступен" if success else "недоступен"
+            lines.append(f"URL {url}: {status}")
+            if not success:
+                lines.append(f"Ошибка: {error}")
+
+        # Прогресс отображается только прогресс-баром; диапазон задается
+        # один раз, когда становится известно количество URL
+        total_urls = task.total_urls
+        if total_urls:
+            if self.progress_bar.maximum() != total_urls:
+                self.progress_bar.setRange(0, total_urls)
+            self.progress_bar.setValue(task.processed)
+
+        if lines:
+            self.log_text.appendPlainText("\n".join(lines))
 
     def _checking_finished(self) -> None:
         """Обработка завершения проверки."""
+        self._results_timer.stop()
+        self._drain_results()
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self._update_log("Проверка завершена")
@@ -399,7 +605,10 @@ class MainWindow(QMainWindow):
         # Останавливаем все процессы
         self._stop_checking()
         
+        self._checker_session.close()
+        
         # Сохраняем настройки
         self._save_settings()
+        self.settings.flush()
         
         event.accept()
@@ -6,69 +6,77 @@
 """
 
 import json
-import os
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, List, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
 
-@dataclass
+# Неизменяемые значения по умолчанию, общие для всех экземпляров Config
+AVAILABLE_MODELS: Tuple[str, ...] = (
+    "gpt-3.5-turbo",
+    "gpt-4",
+    "claude-3-opus",
+    "claude-3-sonnet",
+    "gemini-pro",
+)
+ALLOWED_CONTENT_TYPES: Tuple[str, ...] = (
+    "text/html",
+    "text/plain",
+    "application/xhtml+xml",
+)
+
+
+@dataclass(slots=True)
 class Config:
-    """Класс конфигурации приложения."""
+    """
+    Класс конфигурации приложения.
     
-    def __init__(self, config_path: Optional[str] = None):
-        """
-        Инициализация конфигурации.
-        
-        Args:
-            config_path: Путь к файлу конфигурации
-        """
-        # Базовые настройки
-        self.timeout: int = 5
-        self.retries: int = 3
-        self.threads: int = 4
-        self.browser: str = "Chrome"
-        self.bookmarks_file: Optional[str] = None
-        self.max_redirects: int = 5
-        
-        # Настройки LLM
-        self.openrouter_api_key: Optional[str] = None
-        self.openrouter_model: str = "openai/gpt-3.5-turbo"
-        self.llm_request_delay: int = 1000  # Задержка между запросами в миллисекундах
-        self.available_models: List[str] = [
-            "gpt-3.5-turbo",
-            "gpt-4",
-            "claude-3-opus",
-            "claude-3-sonnet",
-            "gemini-pro"
-        ]
-        
-        # Пути
-        self._cache_dir: Optional[Path] = "cache"
-        self._output_dir: Optional[Path] = "output"
-        self.results_dir: Optional[str] = None
-        
-        # Настройки обработки контента
-        self.save_images: bool = True
-        self.save_links: bool = True
-        self.extract_metadata: bool = True
-        self.max_content_size: int = 10 * 1024 * 1024  # 10 MB
-        self.allowed_content_types: List[str] = [
-            "text/html",
-            "text/plain",
-            "application/xhtml+xml"
-        ]
-        self.excluded_domains: List[str] = []
-        self.user_agent: str = (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/91.0.4472.124 Safari/537.36"
-        )
-        
-        # Загрузка конфигурации из файла, если указан путь
-        self.config_path = config_path
-        if config_path:
-            self.load(config_path)
+    Args:
+        config_path: Путь к файлу конфигурации
+    """
+    
+    config_path: Optional[str] = None
+    
+    # Базовые настройки
+    timeout: int = 5
+    retries: int = 3
+    threads: int = 4
+    browser: str = "Chrome"
+    bookmarks_file: Optional[str] = None
+    max_redirects: int = 5
+    
+    # Настройки LLM
+    openrouter_api_key: Optional[str] = None
+    openrouter_model: str = "openai/gpt-3.5-turbo"
+    llm_request_delay: int = 1000  # Задержка между запросами в миллисекундах
+    available_models: Tuple[str, ...] = AVAILABLE_MODELS
+    
+    # Пути
+    _cache_dir: Optional[Path] = field(default="cache", init=False, repr=False)
+    _output_dir: Optional[Path] = field(default="output", init=False, repr=False)
+    results_dir: Optional[str] = None
+    
+    # Настройки обработки контента
+    save_images: bool = True
+    save_links: bool = True
+    extract_metadata: bool = True
+    max_content_size: int = 10 * 1024 * 1024  # 10 MB
+    allowed_content_types: Tuple[str, ...] = ALLOWED_CONTENT_TYPES
+    excluded_domains: Tuple[str, ...] = ()
+    user_agent: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/91.0.4472.124 Safari/537.36"
+    )
+    
+    def __post_init__(self) -> None:
+        """Загрузка конфигурации из файла, если указан путь."""
+        if self.config_path:
+            self.load(self.config_path)
 
     def save(self, path: str) -> None:
         """
@@ -87,8 +95,11 @@ class Config:
             "output_dir": str(self.output_dir) if self.output_dir else None
         }
         
-        with open(path, 'w') as f:
-            json.dump(config, f, indent=4)
+        path = Path(path)
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        else:
+            path.write_text(json.dumps(config, indent=4), encoding='utf-8')
 
     def load(self, path: str) -> 'Config':
         """
@@ -100,8 +111,8 @@ class Config:
         Returns:
             Config: Объект конфигурации
         """
-        with open(path) as f:
-            config = json.load(f)
+        data = Path(path).read_bytes()
+        config = orjson.loads(data) if orjson is not None else json.loads(data)
             
         self.bookmarks_file = config.get("bookmarks_file")
         self.timeout = config.get("timeout", 5)
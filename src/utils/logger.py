@@ -11,6 +11,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+# Форматтер setup_logger, общий для всех настраиваемых логгеров
+_FORMATTER = logging.Formatter(
+    "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+)
 
 class Logger:
     """Класс для логирования."""
@@ -59,20 +63,15 @@ def setup_logger(name: Optional[str] = None, log_file: Optional[str] = None, lev
     if not logger.handlers:
         logger.setLevel(level)
 
-        # Форматтер для логов
-        formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-        )
-
         # Хендлер для вывода в консоль
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
+        console_handler.setFormatter(_FORMATTER)
         logger.addHandler(console_handler)
 
         # Хендлер для записи в файл, если указан log_file
         if log_file:
             file_handler = logging.FileHandler(log_file, encoding="utf-8")
-            file_handler.setFormatter(formatter)
+            file_handler.setFormatter(_FORMATTER)
             logger.addHandler(file_handler)
 
     return logger
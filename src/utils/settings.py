@@ -8,16 +8,50 @@
 import json
 import os
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+# Настройки по умолчанию; разделы доступны только для чтения и возвращаются
+# геттерами без копирования
+_DEFAULTS = MappingProxyType({
+    "window": MappingProxyType({
+        "size": (800, 600),
+        "position": (100, 100)
+    }),
+    "checker": MappingProxyType({
+        "timeout": 5,
+        "retries": 3,
+        "threads": 4,
+        "browser": "Chrome"
+    }),
+    "llm": MappingProxyType({
+        "model": "gpt-3.5-turbo",
+        "api_key": "",
+        "base_url": "https://api.openai.com/v1"
+    })
+})
+
 class Settings:
     """Класс для работы с настройками приложения."""
     
-    def __init__(self):
-        """Инициализация настроек."""
+    def __init__(self, autosave: bool = False):
+        """
+        Инициализация настроек.
+        
+        Args:
+            autosave: Записывать файл при каждом изменении. По умолчанию
+                изменения хранятся в памяти до вызова flush()
+        """
         self.config_dir = os.path.expanduser("~/.config")
         self.config_file = os.path.join(self.config_dir, "BookmarksChecker.json")
         self.settings = self.load_settings()
+        self._autosave = autosave
+        self._dirty = False
         
     def load_settings(self) -> Dict[str, Any]:
         """
@@ -42,59 +76,60 @@ class Settings:
             # Создаем директорию, если она не существует
             os.makedirs(self.config_dir, exist_ok=True)
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, ensure_ascii=False, indent=4)
+            if orjson is not None:
+                with open(self.config_file, 'wb') as f:
+                    f.write(orjson.dumps(self.settings, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.settings, f, ensure_ascii=False, indent=4)
+            self._dirty = False
         except Exception as e:
             print(f"Ошибка при сохранении настроек: {e}")
     
+    def flush(self) -> None:
+        """Сохранение настроек в файл, если они изменились."""
+        if self._dirty:
+            self.save_settings()
+    
+    def _mark_dirty(self) -> None:
+        """Отметка об изменении настроек."""
+        self._dirty = True
+        if self._autosave:
+            self.save_settings()
+    
     def _get_default_settings(self) -> Dict[str, Any]:
         """
         Получение настроек по умолчанию.
         
         Returns:
-            Dict[str, Any]: Словарь с настройками по умолчанию
+            Dict[str, Any]: Изменяемая копия настроек по умолчанию
         """
-        return {
-            "window": {
-                "size": [800, 600],
-                "position": [100, 100]
-            },
-            "checker": {
-                "timeout": 5,
-                "retries": 3,
-                "threads": 4,
-                "browser": "Chrome"
-            },
-            "llm": {
-                "model": "gpt-3.5-turbo",
-                "api_key": "",
-                "base_url": "https://api.openai.com/v1"
-            }
-        }
+        # Значения разделов неизменяемы, достаточно скопировать сами разделы
+        return {key: dict(value) for key, value in _DEFAULTS.items()}
     
     def get_window_settings(self) -> Dict[str, Any]:
         """Получение настроек окна."""
-        return self.settings.get("window", self._get_default_settings()["window"])
+        return self.settings.get("window", _DEFAULTS["window"])
     
     def get_checker_settings(self) -> Dict[str, Any]:
         """Получение настроек проверки."""
-        return self.settings.get("checker", self._get_default_settings()["checker"])
+        return self.settings.get("checker", _DEFAULTS["checker"])
     
     def get_llm_settings(self) -> Dict[str, Any]:
         """Получение настроек LLM."""
-        return self.settings.get("llm", self._get_default_settings()["llm"])
+        return self.settings.get("llm", _DEFAULTS["llm"])
     
     def update_window_settings(self, settings: Dict[str, Any]) -> None:
         """Обновление настроек окна."""
         self.settings["window"] = settings
-        self.save_settings()
+        self._mark_dirty()
     
     def update_checker_settings(self, settings: Dict[str, Any]) -> None:
         """Обновление настроек проверки."""
         self.settings["checker"] = settings
-        self.save_settings()
+        self._mark_dirty()
     
     def update_llm_settings(self, settings: Dict[str, Any]) -> None:
         """Обновление настроек LLM."""
         self.settings["llm"] = settings
-        self.save_settings() 
\ No newline at end of file
+        self._mark_dirty() 
\ No newline at end of file
@@ -14,9 +14,9 @@ from pathlib import Path
 project_root = str(Path(__file__).parent.parent)
 sys.path.insert(0, project_root)
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def setup_logging():
-    """Настройка логирования для тестов."""
+    """Настройка логирования для тестов (один раз на сессию)."""
     # Создаем форматтер
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
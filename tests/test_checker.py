@@ -1,148 +1,215 @@
 import asyncio
 import ssl
-from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from collections import deque
+from unittest.mock import AsyncMock, patch
 
 import aiohttp
 import pytest
 import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from yarl import URL
 
 from src.core.checker import URLChecker, URLResponse
 
 
-@pytest_asyncio.fixture
-async def checker():
-    async with URLChecker(timeout=1, max_retries=2) as c:
+class _FakeResponse:
+    """Ответ aiohttp без тела: статус, заголовки и итоговый URL."""
+
+    def __init__(self, url, status=200, headers=None):
+        self.url = url
+        self.status = status
+        self.headers = headers or {}
+        self.released = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def release(self):
+        self.released += 1
+
+
+class _MockedResponses:
+    """
+    Подмена aiohttp.ClientSession.head и get: ответы и исключения задаются
+    по URL и выдаются в порядке регистрации, последний с repeat=True
+    повторяется. Вызовы записываются как (метод, url).
+    """
+
+    def __init__(self):
+        self._responses = {}
+        self.calls = []
+
+    def get(self, url, status=200, headers=None, exception=None, repeat=False):
+        response = exception or _FakeResponse(url, status, headers)
+        self._responses.setdefault(str(url), deque()).append((response, repeat))
+        return response
+
+    def _handler(self, method):
+        # Функция в атрибуте класса становится методом ClientSession
+        async def request(session, url, **kwargs):
+            return self._respond(method, url)
+        return request
+
+    def _respond(self, method, url):
+        self.calls.append((method, url))
+        pending = self._responses.get(str(url))
+        if not pending:
+            raise aiohttp.ClientConnectionError(f"No mocked response for {url}")
+        response, repeat = pending[0]
+        if not repeat:
+            pending.popleft()
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    def __enter__(self):
+        self._patchers = [
+            patch("aiohttp.ClientSession.head", new=self._handler("HEAD")),
+            patch("aiohttp.ClientSession.get", new=self._handler("GET")),
+        ]
+        for patcher in self._patchers:
+            patcher.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        for patcher in self._patchers:
+            patcher.stop()
+        return False
+
+
+def _redirect_app() -> web.Application:
+    """
+    Приложение с редиректами: /redirect/{n} перенаправляет n раз и приводит
+    на /final, /loop перенаправляет сам на себя.
+    """
+    async def redirect(request):
+        count = int(request.match_info["count"])
+        raise web.HTTPFound(f"/redirect/{count - 1}" if count > 1 else "/final")
+
+    async def final(request):
+        return web.Response(text="ok", content_type="text/html")
+
+    async def loop(request):
+        raise web.HTTPFound("/loop")
+
+    app = web.Application()
+    # add_get регистрирует и HEAD
+    app.router.add_get("/redirect/{count}", redirect)
+    app.router.add_get("/final", final)
+    app.router.add_get("/loop", loop)
+    return app
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def redirect_server():
+    """Локальный HTTP сервер с редиректами."""
+    async with TestServer(_redirect_app()) as server:
+        yield server
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def _shared_checker():
+    """Проверяющий с одной сессией на все тесты модуля."""
+    async with URLChecker(timeout=1, max_retries=2, retry_min_delay=0) as c:
         yield c
 
 
-@pytest.mark.asyncio
-async def test_successful_request(checker):
-    mock_response_cm = AsyncMock()
-    mock_response_cm.status = 200
-    mock_response_cm.headers = {"content-type": "text/html"}
-    mock_response_cm.url = "http://example.com"
-    mock_response_cm.__aenter__.return_value = mock_response_cm
-
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
-
-    with patch("aiohttp.ClientSession.get", new=mock_get_method):
-        result = await checker.check_url("http://example.com")
-
-        assert result.is_available
-        assert result.status == 200
+@pytest.fixture
+def checker(_shared_checker):
+    """Общий проверяющий со сброшенным состоянием."""
+    max_redirects_count = _shared_checker.max_redirects_count
+    _shared_checker.reset()
+    yield _shared_checker
+    _shared_checker.max_redirects_count = max_redirects_count
+
+
+@pytest.mark.parametrize("response, expected, error, metric", [
+    (
+        {"headers": {"content-type": "text/html"}},
+        {"is_available": True, "status": 200, "retry_count": 0,
+         "final_url": "http://example.com", "headers": None, "content_type": "text/html"},
+        None,
+        "successful_requests",
+    ),
+    (
+        {"exception": asyncio.TimeoutError(), "repeat": True},
+        {"is_available": False, "status": 0, "retry_count": 2, "final_url": None},
+        "Timeout",
+        "timeout_errors",
+    ),
+    (
+        {"exception": aiohttp.ClientError(), "repeat": True},
+        {"is_available": False, "status": 0, "retry_count": 2, "final_url": None},
+        "Network error",
+        "network_errors",
+    ),
+    (
+        {"exception": ssl.SSLError("SSL error")},
+        {"is_available": False, "status": 0, "retry_count": 0, "final_url": None},
+        "SSL error",
+        "ssl_errors",
+    ),
+], ids=["ok", "timeout", "network", "ssl"])
+async def test_check_url_scenarios(checker, response, expected, error, metric):
+    """Проверяет результат check_url (HEAD-запрос) для одного URL: успех и ошибки."""
+    url = "http://example.com"
+
+    with _MockedResponses() as m:
+        mocked = m.get(url, **response)
+        result = await checker.check_url(url)
+
+    assert result.url == url
+    for name, value in expected.items():
+        assert getattr(result, name) == value, name
+    if error is None:
         assert result.error is None
-        assert result.response_time is not None
-        assert result.retry_count == 0
-        assert checker._metrics["successful_requests"] == 1
-
-
-@pytest.mark.asyncio
-async def test_timeout_error(checker):
-    max_retries = checker.max_retries
-    
-    mock_response_cm = AsyncMock()
-    mock_response_cm.__aenter__.side_effect = [asyncio.TimeoutError()] * max_retries
-    
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
-
-    with patch('aiohttp.ClientSession.get', new=mock_get_method):
-        result = await checker.check_url('http://example.com')
-
-        assert not result.is_available
-        assert result.status == 0
-        assert result.error == "Timeout"
-        assert result.retry_count == max_retries
-
-
-@pytest.mark.asyncio
-async def test_network_error(checker):
-    max_retries = checker.max_retries
-    
-    mock_response_cm = AsyncMock()
-    mock_response_cm.__aenter__.side_effect = [aiohttp.ClientError()] * max_retries
-    
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
-
-    with patch('aiohttp.ClientSession.get', new=mock_get_method):
-        result = await checker.check_url('http://example.com')
-
-        assert not result.is_available
-        assert result.status == 0
-        assert "Network error" in result.error
-        assert result.retry_count == max_retries
-
-
-@pytest.mark.asyncio
-async def test_ssl_error(checker):
-    mock_response_cm = AsyncMock()
-    mock_response_cm.__aenter__.side_effect = ssl.SSLError("SSL error")
-    
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
+    else:
+        assert result.error.startswith(error)
+    assert isinstance(result.response_time, float)
+    assert result.response_time >= 0
+    assert checker.get_metrics()[metric] == 1
+    # Повторные попытки выполняются только для сетевых ошибок и таймаутов
+    assert m.calls == [("HEAD", url)] * (expected["retry_count"] or 1)
+    if isinstance(mocked, _FakeResponse):
+        assert mocked.released == 1
 
-    with patch("aiohttp.ClientSession.get", new=mock_get_method):
-        result = await checker.safe_check_url("http://example.com")
 
-        assert not result.is_available
-        assert result.status == 0
-        assert "SSL error" in result.error
-        assert result.response_time is not None
-        assert checker._metrics["ssl_errors"] == 1
-
-
-@pytest.mark.asyncio
 async def test_retry_mechanism(checker):
     max_retries = checker.max_retries
-    
-    response_cms = []
-    for _ in range(max_retries - 1):
-        error_response_cm = AsyncMock()
-        error_response_cm.__aenter__.side_effect = aiohttp.ClientError()
-        response_cms.append(error_response_cm)
-        
-    success_response_cm = AsyncMock()
-    success_response_cm.status = 200
-    success_response_cm.headers = {'content-type': 'text/html'}
-    success_response_cm.url = "http://example.com"
-    success_response_cm.__aenter__.return_value = success_response_cm 
-    response_cms.append(success_response_cm)
-    
-    mock_get_method = AsyncMock(side_effect=response_cms)
-
-    with patch('aiohttp.ClientSession.get', new=mock_get_method):
+
+    with _MockedResponses() as m:
+        # Зарегистрированные ответы выдаются по порядку
+        for _ in range(max_retries - 1):
+            m.get("http://example.com", exception=aiohttp.ClientError())
+        m.get("http://example.com", status=200, headers={"content-type": "text/html"})
         result = await checker.check_url('http://example.com')
 
-        assert result.is_available
-        assert result.status == 200
-        assert result.error is None
-        assert result.retry_count == max_retries - 1
+    assert result.is_available
+    assert result.status == 200
+    assert result.error is None
+    assert result.retry_count == max_retries - 1
 
 
-@pytest.mark.asyncio
 async def test_metrics_collection(checker):
     urls = ["http://example1.com", "http://example2.com"]
 
-    mock_inner_response = Mock(
-        status=200, 
-        headers={"content-type": "text/html"},
-        url="http://example.com/final"
-    )
-    mock_response_cm = AsyncMock()
-    mock_response_cm.__aenter__.return_value = mock_inner_response
-    
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
-    
-    with patch("aiohttp.ClientSession.get", new=mock_get_method):
+    with _MockedResponses() as m:
+        for url in urls:
+            m.get(url, status=200, headers={"content-type": "text/html"})
         results = await checker.check_urls(urls)
 
-        metrics = checker.get_metrics()
-        assert metrics["total_requests"] == 2
-        assert metrics["successful_requests"] == 2
-        assert metrics["failed_requests"] == 0
-        assert len(results) == 2
-        assert all(r.is_available for r in results)
+    metrics = checker.get_metrics()
+    assert metrics["total_requests"] == 2
+    assert metrics["successful_requests"] == 2
+    assert metrics["failed_requests"] == 0
+    assert len(results) == 2
+    assert all(r.is_available for r in results)
 
 
-@pytest.mark.asyncio
 async def test_multiple_error_types(checker):
     urls = [
         "http://timeout.com",
@@ -151,154 +218,203 @@ async def test_multiple_error_types(checker):
         "http://success.com",
     ]
 
-    response_cms_sequence = []
-
-    for _ in range(checker.max_retries):
-        cm = AsyncMock()
-        cm.__aenter__.side_effect = asyncio.TimeoutError()
-        response_cms_sequence.append(cm)
-    for _ in range(checker.max_retries):
-        cm = AsyncMock()
-        cm.__aenter__.side_effect = aiohttp.ClientError()
-        response_cms_sequence.append(cm)
-    cm_ssl = AsyncMock()
-    cm_ssl.__aenter__.side_effect = ssl.SSLError("SSL error")
-    response_cms_sequence.append(cm_ssl)
-    cm_success = AsyncMock()
-    cm_success.status = 200
-    cm_success.headers = {"content-type": "text/html"}
-    cm_success.url = "http://success.com"
-    cm_success.__aenter__.return_value = cm_success
-    response_cms_sequence.append(cm_success)
-    
-    mock_get_method = AsyncMock(side_effect=response_cms_sequence)
-
-    with patch("aiohttp.ClientSession.get", new=mock_get_method):
+    # Проверки выполняются параллельно, ответы выбираются по URL
+    with _MockedResponses() as m:
+        m.get("http://timeout.com", exception=asyncio.TimeoutError(), repeat=True)
+        m.get("http://network.com", exception=aiohttp.ClientError(), repeat=True)
+        m.get("http://ssl.com", exception=ssl.SSLError("SSL error"))
+        m.get("http://success.com", status=200, headers={"content-type": "text/html"})
         results = await checker.check_urls(urls)
 
-        metrics = checker.get_metrics()
-        expected_total_requests = checker.max_retries + checker.max_retries + 1 + 1
-        assert metrics["total_requests"] == expected_total_requests
-        assert metrics["timeout_errors"] == 1
-        assert metrics["network_errors"] == 1
-        assert metrics["ssl_errors"] == 1
-        assert metrics["successful_requests"] == 1
+    metrics = checker.get_metrics()
+    assert metrics["total_requests"] == len(urls)
+    assert metrics["unique_requests"] == len(urls)
+    assert metrics["timeout_errors"] == 1
+    assert metrics["network_errors"] == 1
+    assert metrics["ssl_errors"] == 1
+    assert metrics["successful_requests"] == 1
+
+
+async def test_too_many_redirects(checker, redirect_server):
+    """Проверяет обработку слишком большого количества редиректов."""
+    original_url = str(redirect_server.make_url("/redirect/3"))
+    checker.max_redirects_count = 1 # Устанавливаем малое значение для теста
+
+    result = await checker.check_url(original_url)
 
+    assert not result.is_available
+    assert result.status == 0
+    assert "Too many redirects" in result.error 
+    assert result.url == original_url
+    assert result.final_url is None
+    # Ошибка должна произойти на первой попытке, до того как retry-механизм (цикл) увеличит retry_count
+    assert result.retry_count == 0 
 
-@pytest.mark.asyncio
-async def test_response_time_measurement(checker):
-    mock_response_cm = AsyncMock()
-    mock_response_cm.__aenter__.return_value = Mock(
-        status=200, headers={"content-type": "text/html"}
-    )
 
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
+async def test_redirects_within_limit(checker, redirect_server):
+    """Проверяет корректную обработку нескольких редиректов в пределах лимита."""
+    original_url = str(redirect_server.make_url("/redirect/3"))
+    checker.max_redirects_count = 5 
 
-    with patch("aiohttp.ClientSession.get", new=mock_get_method):
-        result = await checker.check_url("http://example.com")
+    result = await checker.check_url(original_url)
+
+    assert result.is_available
+    assert result.status == 200
+    assert result.url == original_url
+    assert result.final_url == str(redirect_server.make_url("/final"))
+    assert result.error is None
+    assert result.retry_count == 0 # Редиректы не должны вызывать retry
+
+
+async def test_check_urls_respects_max_concurrency():
+    """Проверяет, что одновременно выполняется не больше max_concurrency запросов."""
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_head(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _FakeResponse(args[0], headers={"content-type": "text/html"})
+
+    urls = [f"http://example{i}.com" for i in range(10)]
+    async with URLChecker(timeout=1, max_retries=1, max_concurrency=3) as checker:
+        with patch.object(checker._session, "head", new=slow_head):
+            results = await checker.check_urls(urls)
+
+    assert len(results) == len(urls)
+    assert all(r.is_available for r in results)
+    assert max_in_flight <= 3
+
+
+async def test_check_urls_deduplicates_requests(checker):
+    """Проверяет, что повторяющийся URL проверяется по сети только один раз."""
+    with _MockedResponses() as m:
+        m.get("http://example.com", status=200, headers={"content-type": "text/html"}, repeat=True)
+        results = await checker.check_urls(["http://example.com"] * 3)
+        repeated = await checker.safe_check_url("http://example.com")
+
+    assert len(m.calls) == 1
+    assert len(results) == 3
+    assert all(r.is_available for r in results)
+    assert repeated is results[0]
+
+
+async def test_unreachable_host_short_circuit(checker):
+    """Проверяет, что после серии таймаутов хост больше не опрашивается."""
+    with _MockedResponses() as m:
+        for path in ("page0", "page1", "page2", "other"):
+            m.get(f"http://dead.com/{path}", exception=asyncio.TimeoutError(), repeat=True)
+        for i in range(3):
+            result = await checker.check_url(f"http://dead.com/page{i}")
+            assert result.error == "Timeout"
+        calls_before = len(m.calls)
+
+        result = await checker.check_url("http://dead.com/other")
+
+    assert len(m.calls) == calls_before
+    assert not result.is_available
+    assert result.error == "Host unreachable"
 
-        assert result.response_time is not None
-        assert isinstance(result.response_time, float)
-        assert result.response_time >= 0
 
+def test_retry_delay_is_exponential_and_capped():
+    """Проверяет расчёт задержки между повторными попытками."""
+    checker = URLChecker(retry_multiplier=2.0, retry_min_delay=1.0, retry_max_delay=5.0)
 
-@pytest.mark.asyncio
-async def test_single_redirect_successful(checker):
-    """Проверяет корректную обработку одного редиректа."""
-    original_url = "http://example.com"
-    final_url = "http://final-example.com"
+    assert checker._retry_delay(1) == 1.0
+    assert checker._retry_delay(2) == 2.0
+    assert checker._retry_delay(3) == 4.0
+    assert checker._retry_delay(4) == 5.0
 
-    mock_response_cm = AsyncMock()
-    mock_response_cm.status = 200
-    mock_response_cm.headers = {"content-type": "text/html"}
-    mock_response_cm.url = final_url 
-    mock_response_cm.__aenter__.return_value = mock_response_cm
 
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
+async def test_head_request_by_default():
+    """Проверяет, что по умолчанию используется HEAD-запрос без GET."""
+    head_response = _FakeResponse("http://example.com", headers={"content-type": "text/html"})
 
-    with patch("aiohttp.ClientSession.get", new=mock_get_method) as mock_get_call:
-        result = await checker.check_url(original_url)
+    async with URLChecker(timeout=1, max_retries=1) as checker:
+        with patch.object(checker._session, "head", new=AsyncMock(return_value=head_response)) as mock_head, \
+                patch.object(checker._session, "get", new=AsyncMock()) as mock_get:
+            result = await checker.check_url("http://example.com")
 
-        assert result.is_available
-        assert result.status == 200
-        assert str(result.url).rstrip('/') == original_url.rstrip('/')
-        assert str(result.final_url).rstrip('/') == final_url.rstrip('/')
-        assert result.error is None
-        mock_get_call.assert_called_once_with(
-            original_url, 
-            timeout=checker.timeout, 
-            allow_redirects=True, 
-            ssl=True, 
-            max_redirects=checker.max_redirects_count
-        )
+    assert result.is_available
+    assert result.status == 200
+    mock_head.assert_called_once()
+    mock_get.assert_not_called()
 
 
-@pytest.mark.asyncio
-async def test_too_many_redirects(checker):
-    """Проверяет обработку слишком большого количества редиректов."""
-    original_url = "http://redirect-loop.com"
-    
-    checker.max_redirects_count = 1 # Устанавливаем малое значение для теста
+async def test_head_not_allowed_falls_back_to_get():
+    """Проверяет переход на GET, если сервер не поддерживает HEAD."""
+    head_response = _FakeResponse("http://example.com", status=405)
+    get_response = _FakeResponse("http://example.com", headers={"content-type": "text/html"})
 
-    last_attempted_url = "http://redirect-loop.com/step1"
-    exception_to_raise = aiohttp.TooManyRedirects(
-        history=(), # type: ignore
-        request_info=MagicMock(url=last_attempted_url, method='GET', headers=MagicMock()), # type: ignore
-    )
+    async with URLChecker(timeout=1, max_retries=1) as checker:
+        with patch.object(checker._session, "head", new=AsyncMock(return_value=head_response)), \
+                patch.object(checker._session, "get", new=AsyncMock(return_value=get_response)) as mock_get:
+            result = await checker.check_url("http://example.com")
 
-    # Мок для метода session.get(), который сразу выбрасывает исключение при вызове
-    exploding_get_method = AsyncMock(side_effect=exception_to_raise)
-    
-    with patch.object(checker._session, "get", new=exploding_get_method) as mock_get_call:
-        result = await checker.check_url(original_url)
+    assert result.is_available
+    assert result.status == 200
+    assert head_response.released == 1
+    mock_get.assert_called_once()
 
-    assert not result.is_available
-    assert result.status == 0
-    assert "Too many redirects" in result.error 
-    assert str(result.url).rstrip('/') == original_url.rstrip('/')
-    assert result.final_url is None
-    # Ошибка должна произойти на первой попытке, до того как retry-механизм (цикл) увеличит retry_count
-    assert result.retry_count == 0 
-    
-    mock_get_call.assert_called_once_with(
-        original_url, 
-        timeout=checker.timeout, 
-        allow_redirects=True, 
-        ssl=True, 
-        max_redirects=checker.max_redirects_count 
-    )
-
-
-@pytest.mark.asyncio
-async def test_redirects_within_limit(checker):
-    """Проверяет корректную обработку нескольких редиректов в пределах лимита."""
-    original_url = "http://start.com"
-    final_url = "http://final-destination.com"
 
-    checker.max_redirects_count = 5 
+def test_url_response_to_dict():
+    """Проверяет сериализацию URLResponse в словарь."""
+    response = URLResponse(url="http://example.com", status=200, is_available=True)
 
-    mock_response_cm = AsyncMock()
-    mock_response_cm.status = 200 
-    mock_response_cm.headers = {"content-type": "text/html"}
-    mock_response_cm.url = final_url 
-    mock_response_cm.__aenter__.return_value = mock_response_cm
+    data = response.to_dict()
 
-    mock_get_method = AsyncMock(return_value=mock_response_cm)
+    assert data["url"] == "http://example.com"
+    assert data["status"] == 200
+    assert data["is_available"] is True
+    assert data["final_url"] is None
 
-    with patch("aiohttp.ClientSession.get", new=mock_get_method) as mock_get_call:
-        result = await checker.check_url(original_url)
 
-        assert result.is_available
-        assert result.status == 200
-        assert str(result.url).rstrip('/') == original_url.rstrip('/')
-        assert str(result.final_url).rstrip('/') == final_url.rstrip('/')
-        assert result.error is None
-        assert result.retry_count == 0 # Редиректы не должны вызывать retry
-
-        mock_get_call.assert_called_once_with(
-            original_url, 
-            timeout=checker.timeout, 
-            allow_redirects=True, 
-            ssl=True, 
-            max_redirects=checker.max_redirects_count
-        )
+async def test_check_url_parsed_passes_url_object(checker):
+    """Проверяет, что разобранный URL передаётся в aiohttp без преобразования в строку."""
+    url = URL("http://example.com/page")
+
+    with _MockedResponses() as m:
+        m.get(url, headers={"content-type": "text/html"})
+        result = await checker.check_url_parsed(url)
+
+    assert result.is_available
+    assert result.url == "http://example.com/page"
+    assert m.calls[0][1] is url
+
+
+async def test_reset_clears_state_between_runs(checker):
+    """Проверяет, что reset() очищает состояние между запусками, а сессия aiohttp сохраняется."""
+    urls = ["http://example1.com", "http://example2.com"]
+    session = checker._session
+
+    with _MockedResponses() as m:
+        for url in urls:
+            m.get(url, status=200, headers={"content-type": "text/html"}, repeat=True)
+        await checker.check_urls(urls)
+        checker.reset()
+        assert all(value == 0 for value in checker.get_metrics().values())
+
+        # Повторный запуск проверяет URL заново (кэш результатов очищен)
+        # в той же сессии
+        await checker.check_urls(urls)
+
+    assert checker._session is session
+    assert not session.closed
+    assert checker.get_metrics()["total_requests"] == len(urls)
+    assert len(m.calls) == 2 * len(urls)
+
+
+async def test_head_follows_redirects(redirect_server):
+    """Проверяет, что HEAD-запрос (метод по умолчанию) проходит по редиректам до итогового URL."""
+    async with URLChecker(timeout=1, max_retries=1, max_redirects_count=5) as checker:
+        result = await checker.check_url(str(redirect_server.make_url("/redirect/2")))
+        loop_result = await checker.check_url(str(redirect_server.make_url("/loop")))
+
+    assert result.is_available
+    assert result.status == 200
+    assert result.final_url == str(redirect_server.make_url("/final"))
+    assert not loop_result.is_available
+    assert "Too many redirects" in loop_result.error
@@ -7,8 +7,8 @@
 
 import pytest
 from pathlib import Path
-import threading
-import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 import requests_mock
 import logging
@@ -17,23 +17,49 @@ from src.core.content_processor import ContentProcessor
 
 logger = logging.getLogger(__name__)
 
-@pytest.fixture
-def tmp_path_factory(tmp_path):
-    """Фикстура для создания временных директорий."""
-    class Factory:
-        def mktemp(self, name):
-            path = tmp_path / name
-            path.mkdir(parents=True, exist_ok=True)
-            return path
-    return Factory()
+HTML_TEMPLATE = """
+<html>
+    <head><title>{title}</title></head>
+    <body><p>Content for {title}</p></body>
+</html>
+"""
 
-@pytest.fixture
-def processor(tmp_path_factory):
-    """Фикстура для создания процессора контента."""
+@pytest.fixture(scope="module")
+def prebuilt_pages():
+    """Страницы (url, title, html в байтах), подготовленные один раз на модуль."""
+    return [
+        (f"http://test{i}.com", f"Test {i}", HTML_TEMPLATE.format(title=f"Test {i}").encode())
+        for i in range(10)
+    ]
+
+@pytest.fixture(scope="module")
+def mocked_pages(prebuilt_pages):
+    """Мок requests со всеми подготовленными страницами, регистрируется один раз на модуль."""
+    with requests_mock.Mocker() as m:
+        for url, _, html in prebuilt_pages:
+            m.get(url, content=html)
+        yield m
+
+@pytest.fixture(scope="session")
+def _shared_processor(tmp_path_factory):
+    """Процессор контента, общий для тестов модуля (создается один раз)."""
     results_dir = tmp_path_factory.mktemp("results")
     processor = ContentProcessor(results_dir, max_workers=2)
     yield processor
-    processor.stop_processing()  # Очищаем ресурсы после теста
+    processor.stop_processing()
+
+@pytest.fixture
+def processor(_shared_processor):
+    """Фикстура процессора контента: общий процессор с очищенным состоянием."""
+    processor = _shared_processor
+    yield processor
+    # Сбрасываем состояние для следующего теста
+    if processor.is_running:
+        processor.stop_processing()
+    processor._pending_urls.clear()
+    shutil.rmtree(processor.results_dir)
+    processor.results_dir.mkdir()
+    processor.tracker.clear()
 
 def wait_for_processing_start(processor, timeout=5):
     """
@@ -47,15 +73,9 @@ def wait_for_processing_start(processor, timeout=5):
         bool: True если обработка запущена, False если превышен таймаут
     """
     logger.info(f"Ожидание запуска обработки (таймаут: {timeout}с)")
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        if (processor.executor is not None and 
-            processor.queue_thread is not None and 
-            processor.queue_thread.is_alive() and
-            not processor.stop_event.is_set()):
-            logger.info("Обработка успешно запущена")
-            return True
-        time.sleep(0.1)
+    if processor.queue_thread_started.wait(timeout):
+        logger.info("Обработка успешно запущена")
+        return True
     logger.error("Таймаут ожидания запуска обработки")
     return False
 
@@ -71,26 +91,9 @@ def wait_for_processing(processor, timeout=5):
         bool: True если обработка завершена, False если превышен таймаут
     """
     logger.info(f"Ожидание завершения обработки (таймаут: {timeout}с)")
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        # Проверяем все URL
-        all_completed = True
-        urls = processor.tracker.get_all_urls()
-        logger.info(f"Проверка статусов URL ({len(urls)} шт.)")
-        
-        for url, url_info in urls.items():
-            status = url_info["status"]
-            logger.info(f"URL {url}: статус {status}")
-            if status not in ["completed", "error"]:
-                all_completed = False
-                break
-        
-        if all_completed:
-            logger.info("Все URL обработаны")
-            return True
-            
-        time.sleep(0.1)
-    
+    if processor.idle_event.wait(timeout):
+        logger.info("Все URL обработаны")
+        return True
     logger.error("Таймаут ожидания завершения обработки")
     return False
 
@@ -168,6 +171,8 @@ def test_start_stop_processing(processor):
         processor.stop_processing()
         assert processor.stop_event.is_set()
         assert not processor.is_running
+        # Пул потоков закрывается вместе с обработкой
+        assert processor.executor is None
 
 def test_process_url(processor):
     """Тест обработки URL."""
@@ -201,39 +206,26 @@ def test_process_url(processor):
         assert url_info["markdown_path"] is not None
         assert Path(url_info["markdown_path"]).exists()
 
-def test_process_multiple_urls(processor):
+def test_process_multiple_urls(processor, prebuilt_pages, mocked_pages):
     """Тест обработки нескольких URL."""
-    urls = [
-        ("http://test1.com", "Test 1"),
-        ("http://test2.com", "Test 2"),
-        ("http://test3.com", "Test 3")
-    ]
+    pages = prebuilt_pages[:3]
+    urls = [(url, title) for url, title, _ in pages]
+
+    for url, title, _ in pages:
+        processor.add_url(url, title)
+
+    # Запускаем обработку
+    processor.start_processing()
     
-    html_template = """
-    <html>
-        <head><title>{title}</title></head>
-        <body><p>Content for {title}</p></body>
-    </html>
-    """
+    # Ждем завершения
+    assert wait_for_processing(processor), "Обработка не завершилась вовремя"
     
-    with requests_mock.Mocker() as m:
-        # Настраиваем моки
-        for url, title in urls:
-            m.get(url, text=html_template.format(title=title))
-            processor.add_url(url, title)
-        
-        # Запускаем обработку
-        processor.start_processing()
-        
-        # Ждем завершения
-        assert wait_for_processing(processor), "Обработка не завершилась вовремя"
-        
-        # Проверяем результаты
-        for url, title in urls:
-            url_info = processor.tracker.get_url_info(url)
-            assert url_info["status"] == "completed"
-            assert url_info["markdown_path"] is not None
-            assert Path(url_info["markdown_path"]).exists()
+    # Проверяем результаты
+    for url, title in urls:
+        url_info = processor.tracker.get_url_info(url)
+        assert url_info["status"] == "completed"
+        assert url_info["markdown_path"] is not None
+        assert Path(url_info["markdown_path"]).exists()
 
 def test_error_handling(processor):
     """Тест обработки ошибок."""
@@ -256,113 +248,71 @@ def test_error_handling(processor):
         url_info = processor.tracker.get_url_info(url)
         assert url_info["status"] == "error"
 
-def test_resume_processing(processor):
+def test_resume_processing(processor, prebuilt_pages, mocked_pages):
     """Тест возобновления обработки."""
-    urls = [
-        ("http://test1.com", "Test 1"),
-        ("http://test2.com", "Test 2")
-    ]
+    pages = prebuilt_pages[:2]
+    urls = [(url, title) for url, title, _ in pages]
+
+    for url, title, _ in pages:
+        processor.add_url(url, title)
+
+    # Запускаем обработку
+    processor.start_processing()
     
-    html_template = """
-    <html>
-        <head><title>{title}</title></head>
-        <body><p>Content for {title}</p></body>
-    </html>
-    """
+    # Ждем запуска обработки
+    assert wait_for_processing_start(processor), "Обработка не запустилась"
     
-    with requests_mock.Mocker() as m:
-        # Настраиваем моки
-        for url, title in urls:
-            m.get(url, text=html_template.format(title=title))
-            processor.add_url(url, title)
-        
-        # Запускаем обработку
+    # Останавливаем обработку
+    processor.stop_processing()
+    
+    # Возобновляем обработку
+    processor.start_processing()
+    
+    # Ждем завершения
+    assert wait_for_processing(processor), "Обработка не завершилась вовремя"
+    
+    # Проверяем результаты
+    for url, title in urls:
+        url_info = processor.tracker.get_url_info(url)
+        assert url_info["status"] == "completed"
+        assert url_info["markdown_path"] is not None
+        assert Path(url_info["markdown_path"]).exists()
+
+def test_thread_safety(processor, prebuilt_pages, mocked_pages):
+    """Тест потокобезопасности: URL добавляются из нескольких потоков до и во время обработки."""
+    urls = [(url, title) for url, title, _ in prebuilt_pages]
+    half = len(urls) // 2
+
+    def add_url(item):
+        processor.add_url(*item)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # Первая половина добавляется до запуска обработки
+        list(pool.map(add_url, urls[:half]))
         processor.start_processing()
-        
-        # Ждем запуска обработки
         assert wait_for_processing_start(processor), "Обработка не запустилась"
-        
-        # Останавливаем обработку
-        processor.stop_processing()
-        
-        # Возобновляем обработку
-        processor.start_processing()
-        
-        # Ждем завершения
-        assert wait_for_processing(processor), "Обработка не завершилась вовремя"
-        
-        # Проверяем результаты
-        for url, title in urls:
-            url_info = processor.tracker.get_url_info(url)
-            assert url_info["status"] == "completed"
-            assert url_info["markdown_path"] is not None
-            assert Path(url_info["markdown_path"]).exists()
 
-def test_thread_safety(tmp_path_factory):
-    """Тест потокобезопасности."""
-    results_dir = tmp_path_factory.mktemp("results")
-    processor = ContentProcessor(results_dir, max_workers=4)
-    
-    try:
-        # Создаем множество URL
-        urls = [
-            (f"http://test{i}.com", f"Test {i}")
-            for i in range(10)  # Уменьшаем количество URL
-        ]
-        
-        html_template = """
-        <html>
-            <head><title>{title}</title></head>
-            <body><p>Content</p></body>
-        </html>
-        """
-        
-        with requests_mock.Mocker() as m:
-            # Настраиваем моки
-            for url, title in urls:
-                m.get(url, text=html_template.format(title=title))
-            
-            # Добавляем URL из разных потоков
-            threads = []
-            chunk_size = len(urls) // 2
-            
-            def add_urls(start, end):
-                for i in range(start, end):
-                    url, title = urls[i]
-                    processor.add_url(url, title)
-            
-            # Создаем и запускаем потоки
-            for i in range(0, len(urls), chunk_size):
-                thread = threading.Thread(
-                    target=add_urls,
-                    args=(i, min(i + chunk_size, len(urls)))
-                )
-                threads.append(thread)
-                thread.start()
-            
-            # Ждем завершения добавления URL
-            for thread in threads:
-                thread.join()
-            
-            # Запускаем обработку
-            processor.start_processing()
-            
-            # Ждем запуска обработки
-            assert wait_for_processing_start(processor), "Обработка не запустилась"
-            
-            # Ждем завершения обработки
-            assert wait_for_processing(processor), "Обработка не завершилась вовремя"
-            
-            # Проверяем результаты
-            processed_urls = processor.tracker.get_all_urls()
-            assert len(processed_urls) == len(urls)
-            
-            for url, title in urls:
-                url_info = processor.tracker.get_url_info(url)
-                assert url_info is not None
-                assert url_info["status"] == "completed"
-                assert url_info["markdown_path"] is not None
-                assert Path(url_info["markdown_path"]).exists()
-    
-    finally:
-        processor.stop_processing() 
\ No newline at end of file
+        # Вторая половина - во время обработки
+        list(pool.map(add_url, urls[half:]))
+
+    # Ждем завершения обработки
+    assert wait_for_processing(processor), "Обработка не завершилась вовремя"
+
+    # Проверяем результаты
+    processed_urls = processor.tracker.get_all_urls()
+    assert len(processed_urls) == len(urls)
+
+    for url, title in urls:
+        url_info = processor.tracker.get_url_info(url)
+        assert url_info is not None
+        assert url_info["status"] == "completed"
+        assert url_info["markdown_path"] is not None
+        assert Path(url_info["markdown_path"]).exists()
+
+def test_get_save_path(processor):
+    """Тест построения безопасного пути для markdown файла."""
+    path = processor._get_save_path("http://test.com/page", " Заголовок: test/page? ")
+
+    assert path.parent == processor.results_dir / "test.com"
+    assert path.name.startswith("Заголовок__test_page_")
+    assert path.suffix == ".md"
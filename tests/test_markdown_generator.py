@@ -5,27 +5,25 @@
 @created: 2024-03-21
 """
 
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import lxml.html
 import pytest
 import requests_mock
 import requests
 
-from src.core.markdown_generator import MarkdownGenerator
+from src.core import markdown_generator
+from src.core.markdown_generator import MAX_CONTENT_SIZE, MarkdownGenerator
 
 @pytest.fixture
 def generator():
     """Фикстура для создания генератора markdown."""
     return MarkdownGenerator()
 
-@pytest.fixture
-def tmp_path_factory(tmp_path):
-    """Фикстура для создания временных директорий."""
-    class Factory:
-        def mktemp(self, name):
-            path = tmp_path / name
-            path.mkdir(parents=True, exist_ok=True)
-            return path
-    return Factory()
-
 def test_basic_conversion(generator, tmp_path_factory):
     """Тест базовой конвертации HTML в markdown."""
     html = """
@@ -216,3 +214,259 @@ def test_error_handling(generator, tmp_path_factory):
         result = generator.generate_markdown(url, save_path)
         assert result is not None  # Должен обработать некорректный HTML
         assert save_path.exists()
+
+def test_inline_formatting(generator, tmp_path_factory):
+    """Тест конвертации строчного форматирования."""
+    html = """
+    <html>
+        <head><title>Inline Test</title></head>
+        <body>
+            <p>Plain <strong>bold <em>nested</em></strong> and <code>x = 1</code> tail</p>
+        </body>
+    </html>
+    """
+
+    with requests_mock.Mocker() as m:
+        url = "http://test.com/inline"
+        m.get(url, text=html)
+
+        save_path = tmp_path_factory.mktemp("test") / "inline.md"
+        result = generator.generate_markdown(url, save_path)
+
+        assert result is not None
+        content = result.read_text()
+
+        assert "Plain **bold *nested***" in content
+        assert "and `x = 1` tail" in content
+
+
+async def test_generate_many(generator, tmp_path_factory, monkeypatch):
+    """Тест параллельной загрузки и генерации markdown для нескольких URL."""
+    # Страницы не помещаются в кэш, но повторно не загружаются
+    monkeypatch.setattr(markdown_generator, "HTML_CACHE_MAX_PAGE", 10)
+    pages = {
+        "http://test.com/one": "<html><head><title>One</title></head><body><p>First</p></body></html>",
+        "http://test.com/two": "<html><head><title>Two</title></head><body><p>Second</p></body></html>",
+    }
+
+    async def iter_chunked(body, size):
+        yield body.encode("utf-8")
+
+    def make_response(url, **kwargs):
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        if url in pages:
+            response.content.iter_chunked = lambda size, body=pages[url]: iter_chunked(body, size)
+        else:
+            response.raise_for_status.side_effect = aiohttp.ClientError("404")
+        response.__aenter__ = AsyncMock(return_value=response)
+        response.__aexit__ = AsyncMock(return_value=False)
+        return response
+
+    out_dir = tmp_path_factory.mktemp("many")
+    items = [
+        ("http://test.com/one", str(out_dir / "one.md")),
+        ("http://test.com/two", str(out_dir / "two.md")),
+        ("http://test.com/missing", str(out_dir / "missing.md")),
+    ]
+
+    with patch("aiohttp.ClientSession.get", new=MagicMock(side_effect=make_response)) as mock_get, \
+            patch.object(generator, "_fetch_content") as mock_sync_fetch:
+        results = await generator.generate_many(items)
+        session = generator._async_session
+        # Сессия переиспользуется между вызовами
+        await generator.fetch_many(["http://test.com/one"])
+        assert generator._async_session is session
+    await generator.aclose()
+
+    assert session.closed
+    assert mock_get.call_count == 4
+    mock_sync_fetch.assert_not_called()
+    assert "# One" in results["http://test.com/one"].read_text()
+    assert "Second" in results["http://test.com/two"].read_text()
+    assert results["http://test.com/missing"] is None
+    assert not (out_dir / "missing.md").exists()
+
+
+def test_async_session_is_bound_to_loop():
+    """Открытую сессию нельзя получить из другого цикла событий."""
+    generator = MarkdownGenerator()
+    first_loop = asyncio.new_event_loop()
+    second_loop = asyncio.new_event_loop()
+    try:
+        session = first_loop.run_until_complete(_get_session(generator))
+        with pytest.raises(RuntimeError):
+            second_loop.run_until_complete(_get_session(generator))
+        first_loop.run_until_complete(generator.aclose())
+        assert session.closed
+        # После aclose сессия создается заново в новом цикле
+        second_session = second_loop.run_until_complete(_get_session(generator))
+        assert second_session is not session
+        second_loop.run_until_complete(generator.aclose())
+    finally:
+        first_loop.close()
+        second_loop.close()
+
+
+async def _get_session(generator):
+    return generator._get_async_session()
+
+
+def test_fetched_html_is_cached(generator, tmp_path_factory):
+    """Тест повторного использования загруженной страницы."""
+    html = "<html><head><title>Cached</title></head><body><p>Text</p></body></html>"
+
+    with requests_mock.Mocker() as m:
+        url = "http://test.com/cached"
+        m.get(url, text=html)
+
+        out_dir = tmp_path_factory.mktemp("cache")
+        assert generator.generate_markdown(url, out_dir / "first.md") is not None
+        assert generator.generate_markdown(url, out_dir / "second.md") is not None
+        assert m.call_count == 1
+
+        generator.invalidate(url)
+        assert generator.generate_markdown(url, out_dir / "third.md") is not None
+        assert m.call_count == 2
+
+def test_html_cache_is_limited_by_size(generator, monkeypatch):
+    """Тест ограничения кэша страниц суммарным размером и размером страницы."""
+    monkeypatch.setattr(markdown_generator, "HTML_CACHE_MAX_TOTAL", 10)
+    monkeypatch.setattr(markdown_generator, "HTML_CACHE_MAX_PAGE", 6)
+
+    generator._remember_html("http://test.com/1", "a" * 5)
+    generator._remember_html("http://test.com/2", "b" * 5)
+    generator._remember_html("http://test.com/big", "c" * 7)
+    assert list(generator._html_cache) == ["http://test.com/1", "http://test.com/2"]
+
+    generator._remember_html("http://test.com/3", "d" * 5)
+    assert list(generator._html_cache) == ["http://test.com/2", "http://test.com/3"]
+    assert generator._html_cache_size == 10
+
+    generator.invalidate("http://test.com/2")
+    assert generator._html_cache_size == 5
+
+def test_deeply_nested_content(generator):
+    """Тест обработки глубоко вложенных элементов без рекурсии."""
+    root = lxml.html.fromstring("<div></div>")
+    current = root
+    for _ in range(5000):
+        current = lxml.html.etree.SubElement(current, "span")
+    current.text = "deep"
+
+    assert generator._process_content(root, "http://test.com") == "deep"
+
+def test_title_falls_back_to_h1(generator):
+    """Тест выбора заголовка страницы: <title>, иначе первый <h1>."""
+    with_title = lxml.html.document_fromstring(
+        "<html><body><h1>Heading</h1><title>Title</title></body></html>"
+    )
+    without_title = lxml.html.document_fromstring(
+        "<html><body><h1>First</h1><h1>Second</h1></body></html>"
+    )
+
+    assert generator._get_title(with_title) == "Title"
+    assert generator._get_title(without_title) == "First"
+
+def test_conditional_get_uses_cached_page(tmp_path_factory):
+    """Тест условного запроса: при ответе 304 используется сохранённая копия страницы."""
+    cache_dir = tmp_path_factory.mktemp("html")
+    out_dir = tmp_path_factory.mktemp("out")
+    html = "<html><head><title>Cached Page</title></head><body><p>Body</p></body></html>"
+    url = "http://test.com/etag"
+
+    with requests_mock.Mocker() as m:
+        m.get(url, [
+            {"text": html, "headers": {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}},
+            {"status_code": 304},
+        ])
+
+        assert MarkdownGenerator(cache_dir=cache_dir).generate_markdown(url, out_dir / "first.md") is not None
+        result = MarkdownGenerator(cache_dir=cache_dir).generate_markdown(url, out_dir / "second.md")
+
+        assert m.call_count == 2
+        assert m.request_history[1].headers["If-None-Match"] == '"v1"'
+        assert m.request_history[1].headers["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+        assert result is not None
+        assert "# Cached Page" in result.read_text()
+
+async def test_conditional_get_async(tmp_path_factory):
+    """Тест условного запроса в асинхронной загрузке: HTML копии читается только при 304."""
+    html = "<html><head><title>Async Cached</title></head><body><p>Body</p></body></html>"
+    requests_headers = []
+
+    async def handler(request):
+        requests_headers.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text=html, content_type="text/html", headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/page", handler)
+    cache_dir = tmp_path_factory.mktemp("async_html")
+    async with TestServer(app) as server:
+        url = str(server.make_url("/page"))
+        first = MarkdownGenerator(cache_dir=cache_dir)
+        second = MarkdownGenerator(cache_dir=cache_dir)
+        try:
+            assert (await first.fetch_many([url]))[url] == html
+            with patch.object(second, "_load_page", wraps=second._load_page) as load_page:
+                assert second._conditional_headers(url) == {"If-None-Match": '"v1"'}
+                load_page.assert_not_called()
+                assert (await second.fetch_many([url]))[url] == html
+                load_page.assert_called_once_with(url)
+        finally:
+            await first.aclose()
+            await second.aclose()
+
+    assert requests_headers == [None, '"v1"']
+
+def test_main_content_only(generator, tmp_path_factory):
+    """Тест обработки только основного содержимого страницы."""
+    html = """
+    <html>
+        <head><title>Main Test</title></head>
+        <body>
+            <nav><a href="/home">Home</a></nav>
+            <main>
+                <p>Main text</p>
+                <script>var tracking = 1;</script>
+                <p>After script</p>
+            </main>
+            <footer>Footer text</footer>
+        </body>
+    </html>
+    """
+
+    with requests_mock.Mocker() as m:
+        url = "http://test.com/main"
+        m.get(url, text=html)
+
+        save_path = tmp_path_factory.mktemp("test") / "main.md"
+        result = generator.generate_markdown(url, save_path)
+
+        assert result is not None
+        content = result.read_text()
+
+        assert "Main text" in content
+        assert "After script" in content
+        assert "tracking" not in content
+        assert "Home" not in content
+        assert "Footer text" not in content
+
+
+def test_fetch_content_limits(generator):
+    """Тест фильтра по типу содержимого, размера и кодировки страницы."""
+    with requests_mock.Mocker() as m:
+        m.get("http://test.com/image", content=b"data", headers={"Content-Type": "image/png"})
+        m.get("http://test.com/big", content=b"a" * (MAX_CONTENT_SIZE + 1), headers={"Content-Type": "text/html"})
+        m.get(
+            "http://test.com/cp1251",
+            content='<html><head><meta charset="windows-1251"></head><body>Привет</body></html>'.encode("cp1251"),
+            headers={"Content-Type": "text/html"},
+        )
+
+        assert generator._fetch_content("http://test.com/image") is None
+        assert generator._fetch_content("http://test.com/big") is None
+        assert "Привет" in generator._fetch_content("http://test.com/cp1251")
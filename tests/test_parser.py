@@ -234,3 +234,70 @@ def test_get_bookmarks_by_folder(sample_bookmarks_file):
     assert len(test_folder.children) == 1
     assert test_folder.children[0].name == "Nested Bookmark"
     assert str(test_folder.children[0].url).rstrip("/") == "https://test.com"
+
+
+def test_get_all_urls_keeps_bookmark_order():
+    """Тест порядка URL при обходе вложенных папок."""
+    parser = BookmarksParser("test.json")
+    root = parser.parse_bookmark(
+        {
+            "name": "Root",
+            "type": "folder",
+            "children": [
+                {"name": "A", "url": "https://a.com", "type": "url"},
+                {
+                    "name": "Folder",
+                    "type": "folder",
+                    "children": [{"name": "B", "url": "https://b.com", "type": "url"}],
+                },
+                {"name": "C", "url": "https://c.com", "type": "url"},
+            ],
+        }
+    )
+
+    urls = [url.rstrip("/") for url in parser.get_all_urls(root)]
+    assert urls == ["https://a.com", "https://b.com", "https://c.com"]
+
+
+def test_iter_urls_fast(sample_bookmarks_file):
+    """Тест перебора URL без построения объектов Bookmark."""
+    parser = BookmarksParser(str(sample_bookmarks_file))
+
+    assert list(parser.iter_urls_fast()) == ["https://example.com", "https://test.com"]
+
+
+def test_iter_urls_fast_invalid_file(tmp_path):
+    """Тест перебора URL в некорректном файле."""
+    invalid_file = tmp_path / "invalid.json"
+    invalid_file.write_text("invalid json")
+
+    assert list(BookmarksParser(str(invalid_file)).iter_urls_fast()) == []
+
+
+def test_count_urls(sample_bookmarks_file):
+    """Тест подсчета URL без построения списка."""
+    parser = BookmarksParser(str(sample_bookmarks_file))
+
+    assert parser.count_urls() == 2
+    assert parser.count_urls() == len(list(parser.iter_urls_fast()))
+
+
+def test_unique_urls(tmp_path):
+    """Тест пропуска повторяющихся URL."""
+    bookmarks_file = tmp_path / "Bookmarks"
+    bookmarks_file.write_text(json.dumps({"roots": {"bookmark_bar": {
+        "type": "folder",
+        "children": [
+            {"type": "url", "url": "https://a.com"},
+            {"type": "folder", "children": [
+                {"type": "url", "url": "https://b.com"},
+                {"type": "url", "url": "https://a.com"},
+            ]},
+        ],
+    }}}))
+    parser = BookmarksParser(str(bookmarks_file))
+
+    assert list(parser.iter_urls_fast()) == ["https://a.com", "https://b.com", "https://a.com"]
+    assert list(parser.iter_urls_fast(unique=True)) == ["https://a.com", "https://b.com"]
+    assert parser.count_urls() == 3
+    assert parser.count_urls(unique=True) == 2
@@ -131,16 +131,6 @@ class TestProcessingTracker:
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
-@pytest.fixture
-def tmp_path_factory(tmp_path):
-    """Фикстура для создания временных директорий."""
-    class Factory:
-        def mktemp(self, name):
-            path = tmp_path / name
-            path.mkdir(parents=True, exist_ok=True)
-            return path
-    return Factory()
-
 @pytest.fixture
 def tracker(tmp_path_factory):
     """Фикстура для создания трекера."""
@@ -323,4 +313,98 @@ def test_thread_safety(tmp_path_factory):
         assert url_info is not None
         assert url_info["title"] == title
         assert url_info["status"] == "completed"
-        assert url_info["markdown_path"] == str(Path(f"test_{i}.md")) 
\ No newline at end of file
+        assert url_info["markdown_path"] == str(Path(f"test_{i}.md"))
+
+
+def test_update_url_is_saved_on_flush(tracker):
+    """Тест пакетного сохранения итогового статуса URL."""
+    url = "http://test.com"
+    tracker.add_url(url, "Test")
+    tracker.mark_processing(url)
+    assert tracker.is_processing(url)
+
+    markdown_path = tracker.results_dir / "test.md"
+    tracker.update_url(url, "completed", markdown_path)
+
+    # Изменения видны сразу, но на диск попадают только после flush
+    assert not tracker.is_processing(url)
+    url_info = tracker.get_url_info(url)
+    assert url_info["status"] == "completed"
+    assert url_info["markdown_path"] == str(markdown_path)
+    with open(tracker.log_file, 'r', encoding='utf-8') as f:
+        assert '"completed"' not in f.read()
+
+    tracker.flush()
+    with open(tracker.log_file, 'r', encoding='utf-8') as f:
+        last_op = json.loads(f.readlines()[-1])
+    assert last_op["url"] == url
+    assert last_op["fields"]["status"] == "completed"
+    assert last_op["fields"]["markdown_path"] == str(markdown_path)
+
+
+def test_changes_are_restored_from_log(tmp_path_factory):
+    """Тест восстановления изменений из журнала и записи снимка при закрытии."""
+    results_dir = tmp_path_factory.mktemp("results")
+    tracker = ProcessingTracker(results_dir)
+    url = "http://test.com"
+    tracker.add_url(url, "Test")
+    tracker.update_check_result(url, True)
+
+    # Изменения дописываются в журнал, снимок не перезаписывается
+    with open(tracker.processing_file, 'r', encoding='utf-8') as f:
+        assert json.load(f)["urls"] == {}
+    assert len(tracker.log_file.read_text(encoding='utf-8').splitlines()) == 2
+
+    restored = ProcessingTracker(results_dir)
+    url_info = restored.get_url_info(url)
+    assert url_info["title"] == "Test"
+    assert url_info["status"] == "checked"
+    assert url_info["check_result"] is True
+
+    restored.update_markdown_path(url, Path("test.md"))
+    restored.close()
+    assert not restored.log_file.exists()
+    with open(restored.processing_file, 'r', encoding='utf-8') as f:
+        assert json.load(f)["urls"][url]["status"] == "completed"
+
+
+def test_url_info_is_not_changed_by_updates(tracker):
+    """Тест неизменности ранее прочитанной записи URL."""
+    url = "http://test.com"
+    tracker.add_url(url, "Test")
+    before = tracker.get_url_info(url)
+
+    tracker.update_check_result(url, True)
+
+    assert before["status"] == "pending"
+    assert tracker.get_url_info(url)["status"] == "checked"
+
+
+def test_snapshot_is_compact_and_export_is_pretty(tracker):
+    """Тест компактного снимка состояния и экспорта с отступами."""
+    tracker.add_url("http://test.com", "Test")
+    tracker.close()
+
+    snapshot = tracker.processing_file.read_text(encoding='utf-8')
+    assert "\n" not in snapshot
+    assert json.loads(snapshot)["urls"]["http://test.com"]["title"] == "Test"
+
+    export_path = tracker.results_dir / "export.json"
+    tracker.export(export_path)
+    exported = export_path.read_text(encoding='utf-8')
+    assert '\n  "urls"' in exported
+    assert json.loads(exported)["urls"]["http://test.com"]["status"] == "pending"
+
+
+def test_clear(tracker):
+    """Тест очистки трекера."""
+    tracker.add_url("http://test.com", "Test")
+    tracker.mark_processing("http://test.com")
+
+    tracker.clear()
+
+    assert tracker.get_all_urls() == {}
+    assert not tracker.is_processing("http://test.com")
+    assert not tracker.log_file.exists()
+    with open(tracker.processing_file, 'r', encoding='utf-8') as f:
+        assert json.load(f)["urls"] == {}
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Тесты для модуля настроек приложения.
+"""
+
+import json
+import os
+
+from src.utils.settings import Settings
+
+
+def test_settings_are_written_on_flush(tmp_path, monkeypatch) -> None:
+    """Тест отложенной записи настроек."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    settings = Settings()
+
+    settings.update_checker_settings({"timeout": 10})
+    assert not os.path.exists(settings.config_file)
+
+    settings.flush()
+    with open(settings.config_file, encoding="utf-8") as f:
+        assert json.load(f)["checker"] == {"timeout": 10}
+
+    # Без изменений файл не перезаписывается
+    mtime = os.stat(settings.config_file).st_mtime_ns
+    settings.flush()
+    assert os.stat(settings.config_file).st_mtime_ns == mtime
+    assert Settings().get_checker_settings() == {"timeout": 10}
+
+
+def test_settings_autosave(tmp_path, monkeypatch) -> None:
+    """Тест записи настроек при каждом изменении."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    settings = Settings(autosave=True)
+
+    settings.update_llm_settings({"model": "test"})
+    assert Settings().get_llm_settings() == {"model": "test"}
+
+
+def test_default_settings_are_not_shared(tmp_path, monkeypatch) -> None:
+    """Тест независимости настроек по умолчанию."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    settings = Settings()
+
+    settings.settings["checker"]["timeout"] = 10
+    assert Settings().get_checker_settings()["timeout"] == 5
+    assert settings.get_window_settings()["size"] == (800, 600)